@@ -0,0 +1,8 @@
+/root/package/minisat/core/Main.o /root/package/minisat/core/Main.or /root/package/minisat/core/Main.od /root/package/minisat/core/Main.op: /root/package/minisat/core/Main.cc ../utils/System.h \
+ ../mtl/IntTypes.h ../utils/ParseUtils.h ../utils/Options.h ../mtl/Vec.h \
+ ../mtl/XAlloc.h ../core/Dimacs.h ../core/SolverTypes.h ../mtl/Alg.h \
+ ../mtl/Map.h ../mtl/Alloc.h ../core/Solver.h ../mtl/Heap.h
+/root/package/minisat/core/Solver.o /root/package/minisat/core/Solver.or /root/package/minisat/core/Solver.od /root/package/minisat/core/Solver.op: /root/package/minisat/core/Solver.cc ../mtl/Sort.h ../mtl/Vec.h \
+ ../mtl/IntTypes.h ../mtl/XAlloc.h ../core/Solver.h ../mtl/Heap.h \
+ ../mtl/Alg.h ../utils/Options.h ../utils/ParseUtils.h \
+ ../core/SolverTypes.h ../mtl/Map.h ../mtl/Alloc.h
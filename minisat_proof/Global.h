@@ -59,17 +59,18 @@ template <> struct STATIC_ASSERTION_FAILURE<true>{};
 
 
 //=================================================================================================
-// 'malloc()'-style memory allocation -- never returns NULL; aborts instead:
+// 'malloc()'-style memory allocation -- never returns NULL; throws 'std::bad_alloc' instead, so the
+// library can report an exhausted memory limit to its caller:
 
 
 template<class T> static inline T* xmalloc(size_t size) {
     T*   tmp = (T*)malloc(size * sizeof(T));
-    assert(size == 0 || tmp != NULL);
+    if (size != 0 && tmp == NULL) throw std::bad_alloc();
     return tmp; }
 
 template<class T> static inline T* xrealloc(T* ptr, size_t size) {
     T*   tmp = (T*)realloc((void*)ptr, size * sizeof(T));
-    assert(size == 0 || tmp != NULL);
+    if (size != 0 && tmp == NULL) throw std::bad_alloc();
     return tmp; }
 
 template<class T> static inline void xfree(T *ptr) {
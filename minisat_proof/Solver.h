@@ -138,6 +138,7 @@ public:
              , verbosity        (0)
              , progress_estimate(0)
              , conflict_id      (ClauseId_NULL)
+             , interrupted      (false)
              {
                 vec<Lit> dummy(2,lit_Undef);
                 propagate_tmpbin = Clause_new(false, dummy);
@@ -194,6 +195,7 @@ public:
     vec<lbool>  model;              // If problem is satisfiable, this vector contains the model (if any).
     vec<Lit>    conflict;           // If problem is unsatisfiable under assumptions, this vector represent the conflict clause expressed in the assumptions.
     ClauseId    conflict_id;        // (In proof logging mode only.) ID for the clause 'conflict' (for proof traverseral). NOTE! The empty clause is always the last clause derived, but for conflicts under assumption, this is not necessarly true.
+    volatile bool interrupted;      // May be set from another thread to stop 'solve()' at the next restart or decision. The result is then undefined.
 };
 
 
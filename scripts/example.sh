@@ -14,3 +14,17 @@
 ./run-part2.sh ../models/vis.emodel.E.aag
 
 ./run-part2.sh ../models/cmu.gigamax.B.aag
+
+./run-abstraction.sh ../models/cmu.gigamax.B.aag
+
+./run-induction.sh ../models/vis.emodel.E.aag
+
+./run-pdr.sh ../models/cmu.gigamax.B.aag
+
+./run-properties.sh ../models/texas.two_proc^1.E.aag 14
+
+./run-batch.sh 0 13,14 csv '../models/texas.two_proc^*.E.aag'
+
+./run-budget.sh 1 0 csv 60 4096 '../models/texas.PI_main^*.E.aag'
+
+./run-depth.sh ../models/texas.ifetch1^5.E.aag 64
@@ -0,0 +1,2 @@
+#!/bin/bash
+cd ../src && pypy3 batch.py "$@"
@@ -0,0 +1,2 @@
+#!/bin/bash
+cd ../src && pypy3 batch.py "$1" "$2" "$3" --seconds="$4" --memory="$5" "${@:6}"
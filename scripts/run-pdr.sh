@@ -0,0 +1,2 @@
+#!/bin/bash
+cd ../src && pypy3 bmc.py "$1" 0 5 0
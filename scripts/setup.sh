@@ -5,4 +5,4 @@ cd ../picosat && ./configure && make clean && ./configure && make
 cd ../aiger && ./configure && make clean && ./configure && make
 cd ../minisat/core && make clean && make
 cd ../simp && make clean && make
-cd ../../minisat_proof && make clean && make
+cd ../../minisat_proof && make clean && make && make lib
@@ -0,0 +1,32 @@
+from unrolling import Unrolling
+
+
+# definition of the abstraction object which keeps the latches that the proofs of the bounded model checks need - all
+# other latches are turned into inputs, so the abstract model reaches at least the bad states of the concrete model
+class Abstraction:
+    def __init__(self, unrolling, solver):
+        self.unrolling = unrolling
+        self.solver = solver
+        # the variables of the parsed model of the latches that the abstract model keeps
+        self.relevant_latches = set()
+
+    # return true if the concrete model is safe within the bound and add the latches of its proof to the relevant ones
+    def refine(self, bound):
+        satisfiable, proof = self.solver.solve_with_proof(self.unrolling.bounded_model_checking_clauses(bound))
+        if satisfiable:
+            return False
+        model = self.unrolling.model
+        latches = {literal >> 1 for literal in model.latch_literals}
+        # the variables of the unrolled steps come before the labels and repeat the model variables at every step
+        for variable in proof.get_needed_variables():
+            if variable <= model.maximum_variable_index * (self.unrolling.capacity + 1):
+                variable = (variable - 1) % model.maximum_variable_index + 1
+                if variable in latches:
+                    self.relevant_latches.add(model.original_variables[variable])
+        return True
+
+    # return the unrolling of the abstract model where the latches that are not relevant are inputs
+    def get_unrolling(self):
+        model = self.unrolling.model
+        free_latches = {model.original_variables[literal >> 1] for literal in model.latch_literals} - self.relevant_latches
+        return Unrolling(self.unrolling.aiger, self.unrolling.constants, self.unrolling.outputs, free_latches, self.unrolling.merged)
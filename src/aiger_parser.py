@@ -1,4 +1,5 @@
-from collections import deque
+from array import array
+from mmap import mmap, ACCESS_READ
 
 from dimacs_generator import Node
 
@@ -14,10 +15,73 @@ class Model:
         self.label_running_index = 0
         self.true_index = 0
         self.false_index = 0
-        self.inputs = {}
-        self.latches = {}
-        self.outputs = {}
-        self.and_gates = {}
+        # the dimacs labels of the connectives in the formulas built for this model
+        self.labels = {}
+        # the parsed aiger literals are stored in compact integer columns
+        self.input_literals = array('i')
+        self.latch_literals = array('i')
+        self.latch_next_literals = array('i')
+        self.output_literals = array('i')
+        self.and_gate_literals = array('i')
+        self.and_gate_first_inputs = array('i')
+        self.and_gate_second_inputs = array('i')
+        # the variables of the parsed model indexed by the variables of this model if it has been reduced
+        self.original_variables = None
+        # the node objects are only built from the columns when they are needed
+        self.input_nodes = None
+        self.latch_nodes = None
+        self.output_nodes = None
+        self.and_gate_nodes = None
+
+    # return the inputs as literal nodes
+    @property
+    def inputs(self):
+        if self.input_nodes is None:
+            self.input_nodes = {i: self.literal_object(literal) for i, literal in enumerate(self.input_literals)}
+        return self.input_nodes
+
+    # return the latches as mapping from the current state literal node to the next state literal node
+    @property
+    def latches(self):
+        if self.latch_nodes is None:
+            self.latch_nodes = {self.literal_object(literal): self.literal_object(next_literal)
+                                for literal, next_literal in zip(self.latch_literals, self.latch_next_literals)}
+        return self.latch_nodes
+
+    # return the outputs as literal nodes
+    @property
+    def outputs(self):
+        if self.output_nodes is None:
+            self.output_nodes = {i: self.literal_object(literal) for i, literal in enumerate(self.output_literals)}
+        return self.output_nodes
+
+    # return the and gates as mapping from the output literal node to the two input literal nodes
+    @property
+    def and_gates(self):
+        if self.and_gate_nodes is None:
+            self.and_gate_nodes = {self.literal_object(literal): (self.literal_object(first_input), self.literal_object(second_input))
+                                   for literal, first_input, second_input in
+                                   zip(self.and_gate_literals, self.and_gate_first_inputs, self.and_gate_second_inputs)}
+        return self.and_gate_nodes
+
+    # set the indices of the labels and constants above the variables of all steps up to the bound
+    def set_label_indices(self, bound):
+        # set a start index for the labelling of nodes
+        self.label_running_index = self.maximum_variable_index * (bound + 1)
+        # set the indices for the two boolean constants
+        self.label_running_index += 1
+        self.false_index = self.label_running_index
+        self.label_running_index += 1
+        self.true_index = self.label_running_index
+
+    # convert a single aiger literal integer to a dimacs literal object
+    def literal_object(self, literal):
+        if literal == 0:
+            return Node.false(self)
+        elif literal == 1:
+            return Node.true(self)
+        else:
+            return Node.literal((literal // 2) * (-1 if literal % 2 else 1))
 
 
 # definition the parser object which fills the model object
@@ -26,62 +90,107 @@ class Parser:
         self.aiger = aiger
         self.bound = bound
 
-    # return a parsed deque from the input file content
-    def preprocess(self):
-        # remove string 'aig' from the input file to allow later conversion to integers
-        self.aiger = self.aiger.replace('aag', '')
-        # find and remove an optional comment section
-        comment_section_start_index = self.aiger.find('c\n')
-        self.aiger = self.aiger if comment_section_start_index < 0 else self.aiger[:comment_section_start_index]
-        # create a parsed deque
-        return deque([list(map(int, x.strip().split(' '))) for x in self.aiger.strip().split('\n') if
-                      not x.strip().startswith(('i', 'l', 'o'))])
-
-    # return a model filled by the contents of the parsed deque
+    # return the content of an aiger file as a read only memory map
+    @staticmethod
+    def read(filename):
+        with open(filename, 'rb') as file:
+            return mmap(file.fileno(), 0, access=ACCESS_READ)
+
+    # return the numbers of the header line which are the maximum variable index and the numbers of inputs, latches,
+    # outputs and and gates
+    @staticmethod
+    def read_header(aiger):
+        return list(map(int, aiger[3:aiger.find(b'\n')].split()))
+
+    # return a model filled by the contents of the ascii or binary input file
     def parse(self):
-        # preprocess the input file to a deque
-        lines = self.preprocess()
+        if self.aiger[:3] == b'aig':
+            return self.parse_binary()
+        else:
+            return self.parse_ascii()
+
+    # return a model filled by the contents of an ascii aiger file
+    def parse_ascii(self):
+        aiger = self.aiger
         # the header is the first line in the file
-        header = lines.popleft()
-        # create a model and fill in the information from the header
+        position = aiger.find(b'\n') + 1
+        model = self.create_model(Parser.read_header(aiger))
+        # split off the lines of the numeric section in one pass - the symbol table and comments stay in the last element
+        inputs_end = model.number_of_inputs
+        latches_end = inputs_end + model.number_of_latches
+        outputs_end = latches_end + model.number_of_outputs
+        and_gates_end = outputs_end + model.number_of_and_gates
+        lines = aiger[position:].split(b'\n', and_gates_end)
+        # set the inputs
+        model.input_literals = array('i', map(int, lines[:inputs_end]))
+        # set the latches - the optional reset value of a latch line is ignored
+        latch_literals = array('i', map(int, b' '.join(lines[inputs_end:latches_end]).split()))
+        if len(latch_literals) == 2 * model.number_of_latches:
+            model.latch_literals = latch_literals[0::2]
+            model.latch_next_literals = latch_literals[1::2]
+        else:
+            model.latch_literals = array('i', [int(line.split()[0]) for line in lines[inputs_end:latches_end]])
+            model.latch_next_literals = array('i', [int(line.split()[1]) for line in lines[inputs_end:latches_end]])
+        # set the outputs
+        model.output_literals = array('i', map(int, lines[latches_end:outputs_end]))
+        # set the and gates
+        and_gate_literals = array('i', map(int, b' '.join(lines[outputs_end:and_gates_end]).split()))
+        model.and_gate_literals = and_gate_literals[0::3]
+        model.and_gate_first_inputs = and_gate_literals[1::3]
+        model.and_gate_second_inputs = and_gate_literals[2::3]
+        return model
+
+    # return a model filled by the contents of a binary aiger file
+    def parse_binary(self):
+        aiger = self.aiger
+        # the header is the first line in the file
+        position = aiger.find(b'\n') + 1
+        model = self.create_model(Parser.read_header(aiger))
+        # the inputs are implicitly defined by their position
+        model.input_literals = array('i', range(2, 2 * model.number_of_inputs + 1, 2))
+        # the latch lines only contain the next state literal as the current state literal is implicit
+        model.latch_literals = array('i', range(2 * model.number_of_inputs + 2, 2 * (model.number_of_inputs + model.number_of_latches) + 1, 2))
+        for i in range(model.number_of_latches):
+            line_end = aiger.find(b'\n', position)
+            model.latch_next_literals.append(int(aiger[position:line_end].split()[0]))
+            position = line_end + 1
+        # set the outputs
+        for i in range(model.number_of_outputs):
+            line_end = aiger.find(b'\n', position)
+            model.output_literals.append(int(aiger[position:line_end].split()[0]))
+            position = line_end + 1
+        # the and gates are stored as two delta encoded numbers with an implicit output literal
+        output = 2 * (model.number_of_inputs + model.number_of_latches)
+        for i in range(model.number_of_and_gates):
+            output += 2
+            delta, position = self.decode_delta(aiger, position)
+            first_input = output - delta
+            delta, position = self.decode_delta(aiger, position)
+            model.and_gate_literals.append(output)
+            model.and_gate_first_inputs.append(first_input)
+            model.and_gate_second_inputs.append(first_input - delta)
+        return model
+
+    # return a model filled by the information from the header
+    def create_model(self, header):
         model = Model()
         model.maximum_variable_index = header[0]
         model.number_of_inputs = header[1]
         model.number_of_latches = header[2]
         model.number_of_outputs = header[3]
         model.number_of_and_gates = header[4]
-        # set a start index for the labelling of nodes
-        model.label_running_index = model.maximum_variable_index * (self.bound + 1)
-        # set the indices for the two boolean constants
-        model.label_running_index += 1
-        model.false_index = model.label_running_index
-        model.label_running_index += 1
-        model.true_index = model.label_running_index
-        # set the inputs
-        for i in range(model.number_of_inputs):
-            current_line = lines.popleft()
-            model.inputs[i] = self.literal_object(current_line[0], model)
-        # set the latches
-        for i in range(model.number_of_latches):
-            current_line = lines.popleft()
-            model.latches[self.literal_object(current_line[0], model)] = self.literal_object(current_line[1], model)
-        # set the outputs
-        for i in range(model.number_of_outputs):
-            current_line = lines.popleft()
-            model.outputs[i] = self.literal_object(current_line[0], model)
-        # set the and gates
-        for i in range(model.number_of_and_gates):
-            current_line = lines.popleft()
-            model.and_gates[self.literal_object(current_line[0], model)] = \
-                (self.literal_object(current_line[1], model), self.literal_object(current_line[2], model))
+        model.set_label_indices(self.bound)
         return model
 
-    # convert a single aiger literal integer to a dimacs literal object
+    # decode a delta which is stored in seven bit groups starting at the passed position
     @staticmethod
-    def literal_object(literal, model):
-        if literal == 0:
-            return Node.false(model)
-        elif literal == 1:
-            return Node.true(model)
-        else:
-            return Node.literal((literal // 2) * (-1 if literal % 2 else 1))
+    def decode_delta(aiger, position):
+        delta = 0
+        shift = 0
+        while True:
+            byte = aiger[position]
+            position += 1
+            delta |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return delta, position
+            shift += 7
@@ -0,0 +1,79 @@
+import json
+from csv import writer
+from math import inf
+from glob import glob
+from multiprocessing import Pool, cpu_count
+from sys import argv, stdout
+from time import perf_counter
+
+from bmc import BoundedModelChecker
+from budget import Budget
+
+
+# definition of the batch runner object which spreads the checks of many models and bounds over a process pool
+class BatchRunner:
+    # the fields of every result record
+    FIELDS = ['model', 'mode', 'bound', 'output', 'result', 'step', 'seconds']
+
+    def __init__(self, patterns, bounds, mode, output_format, processes=None, seconds=inf, memory=inf):
+        # the models are given by file names or glob patterns and every model is checked once per bound
+        self.models = [filename for pattern in patterns for filename in sorted(glob(pattern)) or [pattern]]
+        # the interpolation, abstraction, induction and pdr modes do not depend on the bound
+        self.bounds = [0] if mode in (BoundedModelChecker.INTERPOLATION, BoundedModelChecker.ABSTRACTION, BoundedModelChecker.INDUCTION,
+                                      BoundedModelChecker.PDR) else bounds
+        self.mode = mode
+        self.output_format = output_format
+        self.processes = cpu_count() if processes is None else processes
+        # the total seconds of the batch are shared equally by the checks that run in parallel and every check may use
+        # the megabytes of memory on its own
+        jobs = max(1, len(self.models) * len(self.bounds))
+        self.seconds = seconds * min(self.processes, jobs) / jobs
+        self.memory = memory
+
+    # run all checks and print their results in the order in which they finish
+    def start(self):
+        jobs = [(model, bound, self.mode, self.seconds, self.memory) for model in self.models for bound in self.bounds]
+        csv_writer = writer(stdout)
+        if self.output_format == 'csv':
+            csv_writer.writerow(BatchRunner.FIELDS)
+        # every process runs its own solvers in their own temporary files, so the checks do not share any working files -
+        # the memory of a check is measured by the peak of its process, so a memory limit needs a new process per check
+        with Pool(self.processes, maxtasksperchild=1 if self.memory != inf else None) as pool:
+            for records in pool.imap_unordered(BatchRunner.check, jobs):
+                for record in records:
+                    if self.output_format == 'csv':
+                        csv_writer.writerow(record)
+                    else:
+                        stdout.write(json.dumps(dict(zip(BatchRunner.FIELDS, record))) + '\n')
+                stdout.flush()
+
+    # return the result records of one check - a failing check is reported as error instead of stopping the batch and a
+    # check that uses up its budget is reported as unknown with the largest bound it is known to be safe for or without
+    # a step if no bound has been decided
+    @staticmethod
+    def check(job):
+        model, bound, mode, seconds, memory = job
+        start_time = perf_counter()
+        try:
+            checker = BoundedModelChecker(model, bound, mode, budget=Budget(seconds, memory))
+            result = checker.start(out=False)
+        except Exception as exception:
+            return [[model, mode, bound, 0, 'ERROR', type(exception).__name__, round(perf_counter() - start_time, 3)]]
+        seconds = round(perf_counter() - start_time, 3)
+        if checker.exhausted:
+            return [[model, mode, bound, 0, 'UNKNOWN', checker.safe_bound, seconds]]
+        if mode == BoundedModelChecker.PROPERTIES:
+            # the properties mode returns the step of the first bad state of every failing output
+            return [[model, mode, bound, output, 'FAIL', result[output], seconds] if output in result else [model, mode, bound, output, 'OK', bound, seconds]
+                    for output in range(len(checker.outputs))]
+        if mode == BoundedModelChecker.DEPTH:
+            # the depth mode returns the step of the first bad state or none if the model is safe within the bound
+            return [[model, mode, bound, 0, 'OK', bound, seconds] if result is None else [model, mode, bound, 0, 'FAIL', result, seconds]]
+        return [[model, mode, bound, 0, 'OK' if result else 'FAIL', None, seconds]]
+
+
+if __name__ == '__main__':
+    # the total seconds of the batch and the megabytes of every check are optional arguments before the models
+    options = {argument[2:].split('=')[0]: float(argument.split('=')[1]) for argument in argv[4:] if argument.startswith('--')}
+    patterns = [argument for argument in argv[4:] if not argument.startswith('--')]
+    BatchRunner(patterns, [int(bound) for bound in argv[2].split(',')], int(argv[1]), argv[3], **options).start()
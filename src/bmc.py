@@ -1,99 +1,438 @@
-from subprocess import run, PIPE
+from copy import copy
+from math import inf
 from sys import argv
 
+from abstraction import Abstraction
 from aiger_parser import Parser, Node
-from dimacs_generator import Generator
+from budget import Budget, BudgetExhausted
+from fixpoint import Fixpoint
+from interpolant_simplifier import InterpolantSimplifier
+from interpolation import Interpolation
+from model_reducer import ModelReducer
+from pdr import PropertyDirectedReachability
+from profiler import Profiler
+from property_checker import PropertyChecker
+from result_cache import ResultCache
+from sat_solver import SatSolver
+from simulator import Simulator
+from sweeper import Sweeper
+from unrolling import Unrolling
 
 
 # definition of the bmc object which executes the checking routines
 class BoundedModelChecker:
-    def __init__(self, filename, bound, interpolation, debug=False):
-        with open(filename) as file:
-            self.aiger = file.read()
+    # the checking modes
+    BOUNDED_MODEL_CHECKING = 0
+    INTERPOLATION = 1
+    INDUCTION = 2
+    PROPERTIES = 3
+    DEPTH = 4
+    PDR = 5
+    ABSTRACTION = 6
+
+    # the sweep pays off for the engines that prove the model safe for all bounds, so by default the bounded modes skip it
+    def __init__(self, filename, bound, mode, debug=False, cache=True, budget=None, sweep=None):
+        # the budget bounds the time and the memory of the whole check
+        self.budget = Budget() if budget is None else budget
+        self.aiger = Parser.read(filename)
+        # all outputs are checked in the properties mode and only the first one otherwise
+        self.outputs = list(range(Parser.read_header(self.aiger)[3])) if mode == BoundedModelChecker.PROPERTIES else None
+        self.solver = SatSolver.create(self.budget)
+        # the cache is opened before the model is preprocessed, so a check that it decides does not pay for the preprocessing -
+        # the debug and profiled runs measure the checks, so their cache is empty and only kept in memory
+        self.cache = ResultCache(self.aiger, ResultCache.PATH if cache and not debug else ':memory:')
         self.bound = bound
-        self.interpolation = interpolation
+        self.mode = mode
         self.debug = debug
+        self.sweep = mode in (BoundedModelChecker.INTERPOLATION, BoundedModelChecker.ABSTRACTION, BoundedModelChecker.INDUCTION,
+                              BoundedModelChecker.PDR) if sweep is None else sweep
+        # the largest bound up to which the checked outputs are known to be safe if the budget is used up before the
+        # verdict - it stays none if no bound has been decided
+        self.exhausted = False
+        self.safe_bound = None
+        # the preprocessed model is only built by the checks that are not decided by the cache
+        self.input_literals = None
+        self.number_of_latches = None
+        self.simulator = None
+        self.unrolling = None
+        # the constant latches and the merged variables of the parsed model that the unrolling is built with
+        self.constants = None
+        self.merged = None
+
+    # parse the model, reduce it to the cone of influence of the checked outputs, replace its constant latches and
+    # build the unrolling - the model is only preprocessed once
+    def prepare(self):
+        if self.simulator is not None:
+            return
+        parsed_model = Parser(self.aiger, 0).parse()
+        # the witnesses list the values of all inputs of the parsed model
+        self.input_literals = parsed_model.input_literals
+        self.number_of_latches = parsed_model.number_of_latches
+        # the simulation runs on the cone of influence of the checked outputs without labels
+        model = ModelReducer(parsed_model, self.outputs).reduce(0)
+        self.simulator = Simulator(model)
+        # the latches that the ternary simulation proves constant are replaced before unrolling
+        constants = {model.original_variables[variable]: constant for variable, constant in self.simulator.find_constant_latches().items()}
+        # the equivalent and gates and latches of the model without the constant latches are merged before unrolling
+        self.constants = constants
+        self.merged = self.get_equivalences(parsed_model, constants) if self.sweep else {}
+        self.unrolling = Unrolling(self.aiger, constants, self.outputs, merged=self.merged)
 
-    # start the bmc in interpolation or bounded model checking mode
-    def start(self):
-        if self.interpolation:
+    # return the equivalent and gates and latches of the model without the constant latches mapped to the aiger
+    # literals of their representatives
+    def get_equivalences(self, parsed_model, constants):
+        model = ModelReducer(parsed_model, self.outputs, constants).reduce(0)
+        sweeper = Sweeper(model, self.solver)
+        try:
+            sweeper.sweep()
+        except BudgetExhausted:
+            # the equivalences that are proven before the budget is used up are merged
+            pass
+        finally:
+            sweeper.close()
+        return {model.original_variables[variable]: (model.original_variables[literal >> 1] << 1) | (literal & 1)
+                for variable, literal in sweeper.equivalences.items()}
+
+    # start the bmc in interpolation, abstraction, induction, pdr, properties, depth or bounded model checking mode and return its result
+    def start(self, out=True):
+        try:
+            return self.start_mode(out)
+        except BudgetExhausted:
+            # the anytime result is taken from the verdicts that the finished checks have added to the cache
+            self.exhausted = True
+            safe_bound = min(self.cache.get_result(output)[0] for output in range(len(self.outputs or [0])))
+            self.safe_bound = safe_bound if safe_bound >= 0 else None
+            if out:
+                print('UNKNOWN' if self.safe_bound is None else ','.join(['UNKNOWN', str(self.safe_bound)]))
+            return None
+        finally:
+            self.cache.close()
+
+    # start the routine of the checking mode
+    def start_mode(self, out):
+        # a cached proof is only used if its invariant still proves the model safe - the check only needs the unrolling
+        # of the cone of influence, so the rest of the preprocessing is skipped
+        if self.cache.is_proved():
+            self.unrolling = Unrolling(self.aiger, outputs=self.outputs)
+            self.unrolling.extend(1)
+            invariant = self.cache.get_invariant(self.unrolling.model)
+            if invariant is not None and not self.is_invariant(invariant):
+                self.cache.remove_proof()
+        # the checks of every bound are decided by a cached proof or bad state and the bmc check by the verdict of its bound
+        if self.mode in (BoundedModelChecker.INTERPOLATION, BoundedModelChecker.ABSTRACTION, BoundedModelChecker.INDUCTION,
+                         BoundedModelChecker.PDR):
+            safe = self.cache.get_verdict(inf)
+        elif self.mode == BoundedModelChecker.BOUNDED_MODEL_CHECKING:
+            safe = self.cache.get_verdict(self.bound)
+        else:
+            safe = None
+        if safe is not None:
+            if out:
+                print('OK' if safe else 'FAIL')
+            return safe
+        # the properties mode uses the cached verdicts of the single outputs and only preprocesses if they do not suffice
+        if self.mode != BoundedModelChecker.PROPERTIES:
+            self.prepare()
+        if self.mode == BoundedModelChecker.INTERPOLATION:
             if self.debug:
-                print(','.join(['bound', 'proof_tree_size', 'proof_tree_steps', 'interpolant_size', 'interpolants_equal_size']))
-            self.start_interpolation(out=True)
+                print(','.join(['bound', 'proof_tree_size', 'proof_tree_steps', 'interpolant_size', 'containment_size']))
+            return self.start_interpolation(out)
+        elif self.mode == BoundedModelChecker.ABSTRACTION:
+            if self.debug:
+                print(','.join(['bound', 'relevant_latches', 'latches']))
+            return self.start_abstraction(out)
+        elif self.mode == BoundedModelChecker.INDUCTION:
+            if self.debug:
+                print(','.join(['bound', 'induction_step_literals']))
+            return self.start_induction(out)
+        elif self.mode == BoundedModelChecker.PDR:
+            if self.debug:
+                print(','.join(['level', 'blocked_cubes']))
+            return self.start_pdr(out)
+        elif self.mode == BoundedModelChecker.PROPERTIES:
+            assert self.bound >= 0
+            return self.start_properties(out)
+        elif self.mode == BoundedModelChecker.DEPTH:
+            assert self.bound >= 0
+            return self.start_depth(out)
+        elif self.budget.is_limited():
+            assert self.bound >= 0
+            return self.start_deepening(out)
         else:
             assert self.bound >= 0
-            self.start_bmc(self.bound, out=True)
+            return self.start_bmc(self.bound, out)
 
     # start the bmc routine and print if the model is save for the current bound
     def start_bmc(self, bound, out=False):
-        parser = Parser(self.aiger, bound)
-        model = parser.parse()
-        generator = Generator(model, bound)
-        generator.generate_bounded_model_checking_dimacs()
-        output = run(['../minisat/core/minisat_core', '../dimacs/dimacs.txt'], stdout=PIPE).stdout.decode('utf-8')
-        if 'UNSATISFIABLE' in output:
-            if out:
-                print('OK')
-            return True
-        else:
-            if out:
-                print('FAIL')
-            return False
+        safe = self.cache.get_verdict(bound)
+        if safe is None:
+            # the random simulation finds shallow bad states without the sat solver
+            if self.simulator.find_failure(bound) is not None:
+                safe = False
+                bound = self.simulator.failure_step
+            else:
+                # the unrolling keeps the steps of previous checks and only adds the missing ones
+                safe = not self.solver.solve(self.unrolling.bounded_model_checking_clauses(bound))
+            self.cache.add_verdict(bound, safe)
+        if out:
+            print('OK' if safe else 'FAIL')
+        return safe
+
+    # start the bmc routine at doubling bounds up to the bound, so a budget that is used up still leaves the largest safe
+    # bound that has been checked, and print if the model is safe for the bound
+    def start_deepening(self, out=False):
+        bound = 1
+        while bound < self.bound:
+            # a bad state within a smaller bound is also within the bound
+            if not self.start_bmc(bound):
+                if out:
+                    print('FAIL')
+                return False
+            self.budget.next_round()
+            bound *= 2
+        return self.start_bmc(self.bound, out)
 
     # start the interpolation routine and print if the model is save
     def start_interpolation(self, out=False):
         # start with small bound
         current_bound = 1
         while True:
+            # a bound is only checked if the remaining time is expected to suffice for it
+            self.budget.next_round()
             # check if model is safe within the current bound
             if self.start_bmc(current_bound):
-                # if the model is safe within the current bound then create relevant formulas
-                parser = Parser(self.aiger, current_bound)
-                model = parser.parse()
-                generator = Generator(model, current_bound)
-                initial_formula = generator.initial()
-                first_equivalences_formula = generator.equivalences(0, 1)
-                second_equivalences_formula = generator.equivalences(2, current_bound)
-                first_transition_formula = generator.transition(0, 0)
-                second_transition_formula = generator.transition(1, current_bound - 1)
-                safety_formula = generator.safety(current_bound, current_bound)
-                current_interpolant = Node.false(model)
-                while True:
-                    # build the two clause sets and compute the interpolant if possible
-                    first_formula = Node.and_formula(first_equivalences_formula, initial_formula, first_transition_formula)
-                    first_clauses = generator.generate_clauses(first_formula)
-                    second_formula = Node.and_formula(second_equivalences_formula, safety_formula, second_transition_formula)
-                    second_clauses = generator.generate_clauses(second_formula)
-                    generator.build_dimacs(first_clauses.union(second_clauses))
-                    output = run(['../minisat_proof/minisat_proof', '-c', '../dimacs/dimacs.txt'], stdout=PIPE).stdout.decode('utf-8')
-                    if 'UNSATISFIABLE' in output:
-                        # compute interpolant from the unsatisfiability proof
-                        proof_tree = generator.generate_proof_tree(output)
-                        next_interpolant = generator.compute_interpolant(first_clauses, second_clauses, proof_tree)
-                        interpolants_not_equal_formula = Node.not_equal(current_interpolant, next_interpolant)
+                # if the model is safe within the current bound then reuse the unrolled steps for the relevant formulas
+                self.unrolling.extend(current_bound)
+                generator = self.unrolling.generator
+                # the reachable states start with the initial states
+                fixpoint = Fixpoint(generator, self.solver, InterpolantSimplifier(generator, self.solver))
+                # the second clause set is built once for all interpolants at the current bound
+                interpolation = Interpolation(self.unrolling, self.solver, current_bound)
+                try:
+                    while True:
+                        self.budget.check()
+                        # compute the interpolant if possible
+                        interpolant = interpolation.interpolate(fixpoint.reachable_formula)
+                        if interpolant is None:
+                            break
+                        interpolant = fixpoint.simplifier.simplify(interpolant)
+                        contained = fixpoint.contains(interpolant)
                         if self.debug:
-                            print(','.join([str(current_bound), str(len(proof_tree)), str(Generator.get_proof_tree_steps((), proof_tree)),
-                                            str(next_interpolant.count_nodes_in_formula()), str(interpolants_not_equal_formula.count_nodes_in_formula())]))
-                        generator.build_dimacs(generator.generate_clauses(interpolants_not_equal_formula))
-                        output = run(['../minisat/core/minisat_core', '../dimacs/dimacs.txt'], stdout=PIPE).stdout.decode('utf-8')
-                        if 'UNSATISFIABLE' in output:
-                            # interpolant computation has converged
+                            print(','.join([str(current_bound), str(interpolation.proof.count_nodes()), str(interpolation.proof.count_steps()),
+                                            str(interpolant.count_nodes_in_formula()), str(fixpoint.containment_formula.count_nodes_in_formula())]))
+                        if contained:
+                            # interpolant computation has converged because the reachable states contain their image -
+                            # they are only kept as invariant if they prove the model safe on their own
+                            self.add_proof(fixpoint.reachable_formula if self.is_invariant(fixpoint.reachable_formula) else None)
                             if out:
                                 print('OK')
                             return True
                         else:
-                            # interpolant added new information to the initial state - compute new interpolant
-                            initial_formula = Node.or_formula(initial_formula, next_interpolant)
-                            current_interpolant = next_interpolant
-                    else:
-                        # possible satisfiability due to an overapproximation of reachable states in the interpolant - increase bound and try again
-                        current_bound += 1
-                        break
+                            # interpolant added new states to the reachable states - compute new interpolant
+                            fixpoint.add(interpolant)
+                finally:
+                    interpolation.close()
+                # possible satisfiability due to an overapproximation of reachable states in the interpolant - increase bound and try again
+                current_bound += 1
             else:
-                # report FAIL if the model is not safe within the current bound
+                # report FAIL if the model is not safe within the current bound which is kept for the abstraction refinement
+                self.bound = current_bound
                 if out:
                     print('FAIL')
                 return False
 
+    # start the interpolation routine on abstract models that only keep the latches of the proofs of bounded model checks
+    # and print if the model is safe
+    def start_abstraction(self, out=False):
+        abstraction = Abstraction(self.unrolling, self.solver)
+        bound = 0
+        while True:
+            self.budget.next_round()
+            # the concrete check at the bound of the last abstract bad state either confirms it or adds the latches that refute it
+            if not abstraction.refine(bound):
+                self.cache.add_verdict(bound, False)
+                if out:
+                    print('FAIL')
+                return False
+            self.cache.add_verdict(bound, True)
+            if self.debug:
+                print(','.join([str(bound), str(len(abstraction.relevant_latches)), str(self.unrolling.model.number_of_latches)]))
+            # the abstract model is checked by a copy of the checker whose verdicts are not cached
+            checker = copy(self)
+            checker.unrolling = abstraction.get_unrolling()
+            checker.cache = ResultCache(self.aiger, ':memory:')
+            checker.debug = False
+            # the invariant of the abstract model is read back over the concrete model, so it is kept without the facts of the preprocessing
+            checker.constants = None
+            checker.merged = None
+            try:
+                if checker.start_interpolation():
+                    # the invariant of the abstract model is an invariant of the concrete model as well
+                    self.unrolling.extend(1)
+                    invariant = checker.cache.get_invariant(self.unrolling.model)
+                    self.add_proof(invariant if invariant is not None and self.is_invariant(invariant) else None)
+                    if out:
+                        print('OK')
+                    return True
+            finally:
+                checker.cache.close()
+            bound = max(checker.bound, bound + 1)
+
+    # return true if the formula over the model variables holds in the initial state, is kept by the transitions and
+    # excludes the bad states
+    def is_invariant(self, formula):
+        self.unrolling.extend(1)
+        generator = self.unrolling.generator
+        next_formula = generator.increment_steps(formula, 1)
+        for checked_formula, step in ((Node.and_formula(generator.initial(), Node.not_equal(formula, Node.TRUE)), 0),
+                                      (Node.and_formula(formula, Node.not_equal(next_formula, Node.TRUE)), 1),
+                                      (Node.and_formula(formula, self.unrolling.model.outputs[0]), 0)):
+            literals = generator.generate_clauses(checked_formula).literals
+            literals.extend(self.unrolling.equivalence_steps[0])
+            if step == 1:
+                literals.extend(self.unrolling.equivalence_steps[1])
+                literals.extend(self.unrolling.transition_steps[0])
+            if self.solver.solve(literals):
+                return False
+        return True
+
+    # add the proof that the model is safe together with its invariant over the unrolled model if there is one
+    def add_proof(self, invariant=None):
+        self.cache.add_proof(self.unrolling.model, invariant, constants=self.constants, equivalences=self.merged)
+
+    # start the check of all outputs and print for every output if it is safe for the bound or the step of its first bad state
+    def start_properties(self, out=False):
+        outputs = range(len(self.outputs))
+        # the cached results are only used if they decide every output and know the first bad state of every failing one
+        failures = {output: self.cache.get_failure_step(output) for output in outputs if self.cache.get_verdict(self.bound, output) is not True}
+        if None in failures.values():
+            self.prepare()
+            checker = PropertyChecker(self.unrolling, self.solver, self.bound)
+            try:
+                failures = checker.check()
+            except BudgetExhausted:
+                # the undecided outputs are safe up to the last step that has been checked for all of them
+                self.add_property_verdicts(checker.failures, checker.checked_step)
+                raise
+            finally:
+                checker.close()
+            self.add_property_verdicts(failures, self.bound)
+        if out:
+            for output in outputs:
+                if output in failures:
+                    print(','.join([str(output), 'FAIL', str(failures[output])]))
+                else:
+                    print(','.join([str(output), 'OK', str(self.bound)]))
+        return failures
+
+    # add the verdicts of the property checks up to the bound where every failing output is safe before its first bad state
+    def add_property_verdicts(self, failures, bound):
+        for output in range(self.unrolling.model.number_of_outputs):
+            if output in failures:
+                self.cache.add_verdict(failures[output] - 1, True, output)
+                self.cache.add_verdict(failures[output], False, output)
+            else:
+                self.cache.add_verdict(bound, True, output)
+
+    # start the search for the first bad state within the bound and print its step together with a witness or the
+    # bound if there is none
+    def start_depth(self, out=False):
+        # a bad state that the random simulation reaches ends the search
+        bound = self.bound if self.simulator.find_failure(self.bound) is None else self.simulator.failure_step
+        # the steps are added to one incremental unrolling and checked in turn up to the first one that reaches a bad state
+        checker = PropertyChecker(self.unrolling, self.solver, bound)
+        try:
+            failures = checker.check()
+        except BudgetExhausted:
+            self.add_property_verdicts(checker.failures, checker.checked_step)
+            raise
+        finally:
+            checker.close()
+        self.add_property_verdicts(failures, bound)
+        if 0 not in failures:
+            if out:
+                print(','.join(['OK', str(bound)]))
+            return None
+        step = failures[0]
+        if out:
+            print(','.join(['FAIL', str(step)]))
+            print('\n'.join(self.get_witness(checker.models[0], step)))
+        return step
+
+    # return the lines of an aiger witness with the values of all inputs at every step up to the bad state - the inputs
+    # outside the cone of influence are set to zero
+    def get_witness(self, values, step):
+        model = self.unrolling.model
+        variables = {variable: i for i, variable in enumerate(model.original_variables)}
+        lines = ['1', 'b0', '0' * self.number_of_latches]
+        for i in range(step + 1):
+            lines.append(''.join(str(values[variables[literal >> 1] + model.maximum_variable_index * i - 1]) if literal >> 1 in variables else '0'
+                                 for literal in self.input_literals))
+        lines.append('.')
+        return lines
+
+    # start the k-induction routine and print if the model is safe
+    def start_induction(self, out=False):
+        bound = 0
+        while True:
+            self.budget.next_round()
+            # the base case checks that no bad state is reachable within the bound
+            if not self.start_bmc(bound):
+                if out:
+                    print('FAIL')
+                return False
+            # the induction step checks that no bad state follows on safe states that are all different from each other
+            clauses = self.unrolling.induction_clauses(bound)
+            if self.debug:
+                print(','.join([str(bound), str(len(clauses))]))
+            if not self.solver.solve(clauses):
+                self.cache.add_proof(self.unrolling.model)
+                if out:
+                    print('OK')
+                return True
+            bound += 1
+
+    # start the property directed reachability routine and print if the model is safe
+    def start_pdr(self, out=False):
+        # the initial states are checked on their own, so the frames only need to block the bad states of later steps
+        if not self.start_bmc(0):
+            if out:
+                print('FAIL')
+            return False
+        pdr = PropertyDirectedReachability(self.unrolling, self.solver)
+        try:
+            level = 1
+            while True:
+                self.budget.next_round()
+                # report FAIL if a bad state of the frame is reachable from the initial states
+                if not pdr.block_bad_states(level):
+                    if out:
+                        print('FAIL')
+                    return False
+                # no bad state is reachable within the number of steps of the frame
+                self.cache.add_verdict(level, True)
+                if self.debug:
+                    print(','.join([str(level), str(pdr.count_cubes())]))
+                if pdr.propagate():
+                    invariant = pdr.get_invariant()
+                    self.add_proof(invariant if self.is_invariant(invariant) else None)
+                    if out:
+                        print('OK')
+                    return True
+                level += 1
+        finally:
+            pdr.close()
+
 
-BoundedModelChecker(argv[1], int(argv[2]), bool(int(argv[3])), debug=bool(int(argv[4]))).start()
+if __name__ == '__main__':
+    # the phases are profiled into the json lines file of the optional fifth argument
+    if len(argv) > 5:
+        with open(argv[5], 'w') as profile:
+            profiler = Profiler(profile)
+            profiler.install()
+            try:
+                BoundedModelChecker(argv[1], int(argv[2]), int(argv[3]), debug=bool(int(argv[4])), cache=False).start()
+            finally:
+                profiler.close()
+    else:
+        BoundedModelChecker(argv[1], int(argv[2]), int(argv[3]), debug=bool(int(argv[4]))).start()
@@ -0,0 +1,63 @@
+from math import inf
+from resource import getrusage, setrlimit, RLIMIT_AS, RUSAGE_SELF
+from time import perf_counter
+
+
+# the exception that ends a check whose budget is used up - the checker reports the verdicts it has found so far
+class BudgetExhausted(Exception):
+    pass
+
+
+# definition of the budget object which bounds the wall time and the memory of one check - the solver processes are
+# killed at the deadline and every round of an engine is only started if it is expected to finish in time
+class Budget:
+    # the factor by which a round of an engine is expected to take longer than the previous one
+    GROWTH = 2
+
+    def __init__(self, seconds=inf, memory=inf):
+        self.deadline = perf_counter() + seconds
+        # the memory limit in megabytes applies to the checker and to every solver process on its own
+        self.memory = memory
+        # the start of the current round of an engine which is not known before the first round
+        self.round_start = None
+
+    # return the seconds until the deadline
+    def remaining(self):
+        return self.deadline - perf_counter()
+
+    # raise if the deadline has passed or the checker uses more memory than allowed - the peak memory of the process is
+    # compared, so a process only runs one check with a memory limit
+    def check(self):
+        if self.remaining() <= 0:
+            raise BudgetExhausted('time')
+        # the peak resident memory is reported in kilobytes
+        if getrusage(RUSAGE_SELF).ru_maxrss > self.memory * 1024:
+            raise BudgetExhausted('memory')
+
+    # start the next round of an engine if the remaining time is expected to suffice for it
+    def next_round(self):
+        now = perf_counter()
+        if self.round_start is not None and Budget.GROWTH * (now - self.round_start) > self.remaining():
+            raise BudgetExhausted('time')
+        self.round_start = now
+        self.check()
+
+    # return true if the check has a deadline
+    def is_limited(self):
+        return self.deadline != inf
+
+    # return the seconds a single solve may take at most or none if there is no deadline
+    def get_timeout(self):
+        if self.deadline == inf:
+            return None
+        self.check()
+        return self.remaining()
+
+    # return the keyword arguments that limit the time and the memory of a solver process
+    def get_process_limits(self):
+        limits = {'timeout': self.get_timeout()}
+        if self.memory != inf:
+            memory = int(self.memory * 1024 * 1024)
+            limits['preexec_fn'] = lambda: setrlimit(RLIMIT_AS, (memory, memory))
+        return limits
+
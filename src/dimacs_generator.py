@@ -1,4 +1,6 @@
+from array import array
 from enum import Enum
+from weakref import WeakValueDictionary
 
 
 # an enum to manage the different types of nodes used in formulas
@@ -8,39 +10,27 @@ class NodeType(Enum):
     OR = 2
     EQUAL = 3
     NOT_EQUAL = 4
+    TRUE = 5
+    FALSE = 6
 
 
 # definition of the generator object which generates formulas
 class Generator:
-    def __init__(self, model, bound):
+    # the polarities a subformula occurs in
+    POSITIVE = 1
+    NEGATIVE = 2
+    BOTH = 3
+
+    def __init__(self, model):
         self.model = model
-        self.bound = bound
-
-    # this writes the bmc formula to the dimacs file
-    def generate_bounded_model_checking_dimacs(self):
-        # build expression tree of bmc formula
-        formula = Node.and_formula(self.equivalences(), self.initial(), self.transition(), self.safety())
-        # generate a clause set from the formula
-        clauses = self.generate_clauses(formula)
-        # write the clause set in dimacs style to the file
-        self.build_dimacs(clauses)
-
-    # return the formula that enforces the equivalences from the and gates
-    def equivalences(self, start=None, end=None):
-        if start is None:
-            start = 0
-        if end is None:
-            end = self.bound
+
+    # return the formula that enforces the equivalences from the and gates at step 0
+    def step_equivalences(self):
         equivalences = Node.true(self.model)
         for out, (inp_0, inp_1) in self.model.and_gates.items():
-            equivalence = Node.equal(out.get_copy(), Node.and_formula(inp_0.get_copy(), inp_1.get_copy()))
+            equivalence = Node.equal(out, Node.and_formula(inp_0, inp_1))
             equivalences = Node.and_formula(equivalences, equivalence)
-        all_equivalences = Node.true(self.model)
-        for i in range(start, end + 1):
-            current_step_equivalences = equivalences.get_copy()
-            self.increment_steps(current_step_equivalences, i)
-            all_equivalences = Node.and_formula(all_equivalences, current_step_equivalences)
-        return all_equivalences
+        return equivalences
 
     # build up the initial state formula that guarantees that all latches are initialized to zero
     def initial(self):
@@ -49,372 +39,522 @@ class Generator:
             formula = Node.and_formula(formula, out.get_negated_literal_copy())
         return formula
 
-    # build up the safety formula which is satisfiable if a bad state has been reached at any step
-    def safety(self, start=None, end=None):
-        if start is None:
-            start = 0
-        if end is None:
-            end = self.bound
-        formula = Node.false(self.model)
-        bad_state_detector = self.model.outputs[0]
-        for i in range(start, end + 1):
-            current_step_bad_state_detector = bad_state_detector.get_copy()
-            self.increment_steps(current_step_bad_state_detector, i)
-            formula = Node.or_formula(formula, current_step_bad_state_detector)
-        return formula
-
-    # build up the transition formula that connects previous step inputs to next step outputs for every latch
-    def transition(self, start=None, end=None):
-        if start is None:
-            start = 0
-        if end is None:
-            end = self.bound - 1
-        formula = Node.true(self.model)
-        transition_formula = self.transition_formula()
-        for i in range(start, end + 1):
-            transition_step = transition_formula.get_copy()
-            self.increment_steps(transition_step, i)
-            formula = Node.and_formula(formula, transition_step)
-        return formula
-
     # build up the transition step formula from step 0 to 1
     def transition_formula(self):
         formula = Node.true(self.model)
         for out in self.model.latches:
-            next_step_out = out.get_copy()
-            self.increment_steps(next_step_out, 1)
-            prev_step_in = self.model.latches[out].get_copy()
+            next_step_out = self.increment_steps(out, 1)
+            prev_step_in = self.model.latches[out]
             transition = Node.equal(next_step_out, prev_step_in)
             formula = Node.and_formula(formula, transition)
         return formula
 
-    # increments the steps of literals in a formula
+    # returns the formula with incremented steps of the literals - shared subformulas are only incremented once
     def increment_steps(self, formula, steps):
-        if formula.is_literal():
-            literal = formula
-            if literal not in Node.get_constants(self.model):
-                value = self.model.maximum_variable_index * steps
-                if literal.is_negative_literal():
-                    literal.label -= value
-                elif literal.is_positive_literal():
-                    literal.label += value
-        else:
-            self.increment_steps(formula.first_argument, steps)
-            self.increment_steps(formula.second_argument, steps)
-
-    # construct a cnf formula using tseitin transformation
-    def generate_clauses(self, formula):
-        # label all connectives
-        self.add_labels(formula)
-        # force the sat solver to pick the two constants to true and false
-        clauses = {(formula.label,), (self.model.true_index,), (-self.model.false_index,)}
-        processed_formulas = set()
-        # transform the expression tree to clauses and add them to the set
-        self.add_equivalences_to_clauses(formula, clauses, processed_formulas)
+        value = self.model.maximum_variable_index * steps
+        incremented_formulas = {}
+        # the arguments of a connective are incremented before the connective itself
+        for subformula in formula.get_subformulas():
+            if subformula.is_literal():
+                incremented_formula = Node.literal(subformula.label - value if subformula.is_negative_literal() else subformula.label + value)
+            elif subformula.is_connective():
+                incremented_formula = Node.create(subformula.node_type, incremented_formulas[subformula.first_argument],
+                                                  incremented_formulas[subformula.second_argument])
+            else:
+                incremented_formula = subformula
+            incremented_formulas[subformula] = incremented_formula
+        return incremented_formulas[formula]
+
+    # return the clause set as flat array of zero terminated clauses
+    @staticmethod
+    def flatten(clauses):
+        if isinstance(clauses, ClauseStore):
+            return clauses.literals
+        literals = array('i')
+        for clause in clauses:
+            literals.extend(clause)
+            literals.append(0)
+        return literals
+
+    # construct a cnf formula using tseitin transformation - only the implications needed for the formula to hold are generated
+    def generate_clauses(self, formula, labels=None, constants=True):
+        if labels is None:
+            labels = self.model.labels
+        clauses = ClauseStore()
+        if constants:
+            # force the sat solver to pick the two constants to true and false
+            clauses.add(self.model.true_index)
+            clauses.add(-self.model.false_index)
+        # the asserted conjunctions, disjunctions and equalities are transformed without labels
+        definitions = self.add_assertions_to_clauses(formula, clauses, labels)
+        # transform the expression tree below the asserted parts to clauses
+        self.add_definitions_to_clauses(definitions, clauses, labels)
         return clauses
 
-    # generate the dimacs file
-    def build_dimacs(self, clauses):
-        with open('../dimacs/dimacs.txt', 'w') as file:
-            file.write(f'p cnf {self.model.label_running_index} {len(clauses)}\n')
-            [file.write(f'{" ".join(map(str, clause))} 0\n') for clause in clauses]
-
-    # label all unlabelled nodes in the syntax tree of the formula
-    def add_labels(self, formula):
-        if not formula.is_literal() and formula.label == 0:
-            self.model.label_running_index += 1
-            formula.label = self.model.label_running_index
-            self.add_labels(formula.first_argument)
-            self.add_labels(formula.second_argument)
-
-    # generate clauses for all equivalences enforced by the expression tree - each formula is only processed once
-    def add_equivalences_to_clauses(self, formula, clauses, processed_formulas):
-        if not formula.is_literal() and formula not in processed_formulas:
-            label = formula.label
-            assert label != 0
-            first_argument = formula.first_argument.label
-            assert first_argument != 0
-            second_argument = formula.second_argument.label
-            assert second_argument != 0
-            if formula.is_and():
-                clauses.add(self.get_clause(label, first_argument * -1, second_argument * -1))
-                clauses.add(self.get_clause(label * -1, first_argument))
-                clauses.add(self.get_clause(label * -1, second_argument))
+    # return the dimacs formula of a clause set or of flat zero terminated clauses as one buffer
+    @staticmethod
+    def get_dimacs(clauses):
+        literals = clauses if isinstance(clauses, array) else Generator.flatten(clauses)
+        # folded formulas may not contain the most recent labels, so the header states the largest variable in use
+        number_of_variables = max(map(abs, literals))
+        body = ' '.join(map(str, literals)).replace(' 0 ', ' 0\n')
+        return f'p cnf {number_of_variables} {literals.count(0)}\n{body}\n'.encode('ascii')
+
+    # label all unlabelled connectives in the syntax tree of the formula - the labels are stored per model by default
+    def add_labels(self, formula, labels):
+        # the connectives are labelled in preorder with the first argument before the second one
+        stack = [formula]
+        while stack:
+            formula = stack.pop()
+            if formula.is_connective() and formula not in labels:
+                self.model.label_running_index += 1
+                labels[formula] = self.model.label_running_index
+                stack.append(formula.second_argument)
+                stack.append(formula.first_argument)
+
+    # return the dimacs label of a literal, constant or labelled connective
+    def get_label(self, formula, labels=None):
+        if formula.is_literal():
+            return formula.label
+        elif formula.is_true():
+            return self.model.true_index
+        elif formula.is_false():
+            return self.model.false_index
+        else:
+            return (self.model.labels if labels is None else labels)[formula]
+
+    # convert a dimacs label to a literal object where the indices of the constants are mapped to the constants
+    def literal_object(self, label):
+        if label == self.model.true_index or label == -self.model.false_index:
+            return Node.true(self.model)
+        elif label == self.model.false_index or label == -self.model.true_index:
+            return Node.false(self.model)
+        else:
+            return Node.literal(label)
+
+    # generate the clauses that assert the formula and return the referenced connectives with the polarity they occur in
+    def add_assertions_to_clauses(self, formula, clauses, labels):
+        definitions = []
+
+        # return the label of an argument whose connective is defined in the passed polarity
+        def reference(argument, polarity):
+            if argument.is_connective():
+                self.add_labels(argument, labels)
+                definitions.append((argument, polarity))
+            return self.get_label(argument, labels)
+
+        stack = [formula]
+        while stack:
+            formula = stack.pop()
+            if formula.is_true():
+                continue
+            elif formula.is_and():
+                # the conjuncts are asserted separately
+                stack.append(formula.second_argument)
+                stack.append(formula.first_argument)
             elif formula.is_or():
-                clauses.add(self.get_clause(label * -1, first_argument, second_argument))
-                clauses.add(self.get_clause(label, first_argument * -1))
-                clauses.add(self.get_clause(label, second_argument * -1))
-            elif formula.is_equal():
-                clauses.add(self.get_clause(label, first_argument, second_argument))
-                clauses.add(self.get_clause(label * -1, first_argument * -1, second_argument))
-                clauses.add(self.get_clause(label * -1, first_argument, second_argument * -1))
-                clauses.add(self.get_clause(label, first_argument * -1, second_argument * -1))
-            elif formula.is_not_equal():
-                clauses.add(self.get_clause(label * -1, first_argument * -1, second_argument * -1))
-                clauses.add(self.get_clause(label, first_argument, second_argument * -1))
-                clauses.add(self.get_clause(label, first_argument * -1, second_argument))
-                clauses.add(self.get_clause(label * -1, first_argument, second_argument))
+                # the disjuncts of an or chain form a single clause
+                disjuncts = []
+                or_stack = [formula]
+                while or_stack:
+                    disjunct = or_stack.pop()
+                    if disjunct.is_or():
+                        or_stack.append(disjunct.second_argument)
+                        or_stack.append(disjunct.first_argument)
+                    else:
+                        disjuncts.append(reference(disjunct, Generator.POSITIVE))
+                clauses.add(*disjuncts)
+            elif formula.is_equal() or formula.is_not_equal():
+                first_argument, second_argument = formula.first_argument, formula.second_argument
+                if first_argument.is_connective() and not second_argument.is_connective():
+                    first_argument, second_argument = second_argument, first_argument
+                sign = 1 if formula.is_equal() else -1
+                if not first_argument.is_connective() and second_argument.is_connective():
+                    # a gate output equal to a connective is used as its label
+                    self.add_definition_to_clauses(second_argument, self.get_label(first_argument, labels) * sign,
+                                                   reference(second_argument.first_argument, Generator.BOTH),
+                                                   reference(second_argument.second_argument, Generator.BOTH), Generator.BOTH, clauses)
+                else:
+                    first_label = reference(first_argument, Generator.BOTH)
+                    second_label = reference(second_argument, Generator.BOTH) * sign
+                    clauses.add(first_label * -1, second_label)
+                    clauses.add(first_label, second_label * -1)
             else:
-                raise NotImplementedError()
-            processed_formulas.add(formula)
-            self.add_equivalences_to_clauses(formula.first_argument, clauses, processed_formulas)
-            self.add_equivalences_to_clauses(formula.second_argument, clauses, processed_formulas)
-
-    # compute the interpolant out of two clause sets and a proof tree
-    def compute_interpolant(self, first_clauses, second_clauses, proof_tree):
-        first_variables = set()
-        for clause in first_clauses:
-            for literal in clause:
-                first_variables.add(abs(literal))
-        second_variables = set()
-        for clause in second_clauses:
+                clauses.add(reference(formula, Generator.POSITIVE))
+        return definitions
+
+    # generate the clauses that define the labels of the connectives below the referenced ones in the polarity they occur in -
+    # the polarities of connectives that are already defined by earlier clauses can be passed to only add the missing ones
+    def add_definitions_to_clauses(self, definitions, clauses, labels, encoded=None):
+        if encoded is None:
+            encoded = {}
+        stack = list(definitions)
+        while stack:
+            formula, polarity = stack.pop()
+            if formula.is_connective():
+                # the implications of every polarity are generated once for every connective
+                polarity &= ~encoded.get(formula, 0)
+                if polarity:
+                    encoded[formula] = encoded.get(formula, 0) | polarity
+                    self.add_definition_to_clauses(formula, self.get_label(formula, labels), self.get_label(formula.first_argument, labels),
+                                                   self.get_label(formula.second_argument, labels), polarity, clauses)
+                    # the arguments of equalities occur in both polarities
+                    argument_polarity = polarity if formula.is_and() or formula.is_or() else Generator.BOTH
+                    stack.append((formula.second_argument, argument_polarity))
+                    stack.append((formula.first_argument, argument_polarity))
+
+    # generate the clauses for the implications between a label and the connective of its arguments that are needed in the polarity
+    @staticmethod
+    def add_definition_to_clauses(formula, label, first_argument, second_argument, polarity, clauses):
+        if formula.is_and():
+            if polarity & Generator.POSITIVE:
+                clauses.add(label * -1, first_argument)
+                clauses.add(label * -1, second_argument)
+            if polarity & Generator.NEGATIVE:
+                clauses.add(label, first_argument * -1, second_argument * -1)
+        elif formula.is_or():
+            if polarity & Generator.POSITIVE:
+                clauses.add(label * -1, first_argument, second_argument)
+            if polarity & Generator.NEGATIVE:
+                clauses.add(label, first_argument * -1)
+                clauses.add(label, second_argument * -1)
+        elif formula.is_equal():
+            if polarity & Generator.POSITIVE:
+                clauses.add(label * -1, first_argument * -1, second_argument)
+                clauses.add(label * -1, first_argument, second_argument * -1)
+            if polarity & Generator.NEGATIVE:
+                clauses.add(label, first_argument, second_argument)
+                clauses.add(label, first_argument * -1, second_argument * -1)
+        elif formula.is_not_equal():
+            if polarity & Generator.POSITIVE:
+                clauses.add(label * -1, first_argument, second_argument)
+                clauses.add(label * -1, first_argument * -1, second_argument * -1)
+            if polarity & Generator.NEGATIVE:
+                clauses.add(label, first_argument * -1, second_argument)
+                clauses.add(label, first_argument, second_argument * -1)
+        else:
+            raise NotImplementedError()
+
+    # compute the interpolant out of two clause sets and the resolution proof of their unsatisfiability - the variables
+    # of the second clause set can be passed if they are known
+    def compute_interpolant(self, first_clauses, second_clauses, proof, second_variables=None):
+        if second_variables is None:
+            second_variables = self.get_variables(second_clauses)
+        # the parents of a node precede it so the nodes needed for the goal are labelled in their order
+        needed = proof.get_needed_nodes()
+        labels = [None] * len(needed)
+        for node in range(len(needed)):
+            if needed[node]:
+                labels[node] = self.compute_label(node, first_clauses, second_clauses, second_variables, proof, labels)
+        return labels[proof.get_goal()]
+
+    # return the variables of a clause set
+    @staticmethod
+    def get_variables(clauses):
+        variables = set()
+        for clause in clauses:
             for literal in clause:
-                second_variables.add(abs(literal))
-        labels = {}
-        self.compute_labels((), first_clauses, second_clauses, first_variables, second_variables, proof_tree, labels)
-        return labels[()]
-
-    # compute a label of some clause in the proof_tree
-    def compute_labels(self, clause, first_clauses, second_clauses, first_variables, second_variables, proof_tree, labels):
-        if clause not in labels:
+                variables.add(abs(literal))
+        return variables
+
+    # compute the label of a node in the proof out of the labels of its parents
+    def compute_label(self, node, first_clauses, second_clauses, second_variables, proof, labels):
+        if node in proof.roots:
+            clause = proof.roots[node]
             if clause in first_clauses:
                 relevant_literals = [x for x in clause if abs(x) in second_variables]
                 if len(relevant_literals) == 0:
-                    label = Node.false(self.model)
+                    return Node.false(self.model)
                 else:
-                    label = Node.or_formula(*[Node.literal(literal) for literal in relevant_literals])
-                    self.increment_steps(label, -1)
+                    return self.increment_steps(Node.or_formula(*[self.literal_object(literal) for literal in relevant_literals]), -1)
             elif clause in second_clauses:
-                label = Node.true(self.model)
+                return Node.true(self.model)
             else:
-                resolved_on_variable = proof_tree[clause][1]
-                self.compute_labels(proof_tree[clause][0], first_clauses, second_clauses, first_variables, second_variables, proof_tree, labels)
-                left_parent_label = labels[proof_tree[clause][0]]
-                self.compute_labels(proof_tree[clause][2], first_clauses, second_clauses, first_variables, second_variables, proof_tree, labels)
-                right_parent_label = labels[proof_tree[clause][2]]
-                if resolved_on_variable in first_variables and resolved_on_variable not in second_variables:
-                    if left_parent_label == Node.true(self.model) or right_parent_label == Node.true(self.model):
-                        label = Node.true(self.model)
-                    elif left_parent_label == Node.false(self.model):
-                        label = right_parent_label
-                    elif right_parent_label == Node.false(self.model):
-                        label = left_parent_label
-                    else:
-                        label = Node.or_formula(left_parent_label, right_parent_label)
-                else:
-                    if left_parent_label == Node.false(self.model) or right_parent_label == Node.false(self.model):
-                        label = Node.false(self.model)
-                    elif left_parent_label == Node.true(self.model):
-                        label = right_parent_label
-                    elif right_parent_label == Node.true(self.model):
-                        label = left_parent_label
-                    else:
-                        label = Node.and_formula(left_parent_label, right_parent_label)
-            labels[clause] = label
+                raise ValueError(f'root clause {clause} is not part of the clause sets')
+        else:
+            resolved_on_variable = proof.variables[node]
+            left_parent_label = labels[proof.first_parents[node]]
+            right_parent_label = labels[proof.second_parents[node]]
+            # the variables of the proof that do not occur in the second clause set are local to the first one
+            # and the constants are folded by the node constructors
+            if resolved_on_variable not in second_variables:
+                return Node.or_formula(left_parent_label, right_parent_label)
+            else:
+                return Node.and_formula(left_parent_label, right_parent_label)
 
     # return a sorted clause without duplicates
     @staticmethod
     def get_clause(*labels):
         return tuple(sorted(set(labels)))
 
-    # return the resolution steps from the root clauses to the passed clause
-    @staticmethod
-    def get_proof_tree_steps(clause, proof_tree):
-        if len(proof_tree[clause]) == 0:
-            return 0
-        else:
-            return 1 + Generator.get_proof_tree_steps(proof_tree[clause][0], proof_tree) + \
-                   Generator.get_proof_tree_steps(proof_tree[clause][2], proof_tree)
 
-    # generate a proof tree out of the sat solver output
-    @staticmethod
-    def generate_proof_tree(output):
-        output = output[output.find('...') + len('...'):].strip()
-        if 'Final clause: <empty>' in output:
-            # ordinary case
-            output = output[:output.find('Final clause: <empty>')].strip() + ' 0'
-        else:
-            # trivial case
-            output = output[:output.find('Trivial problem')].strip()
-            line = output.count('\n')
-            output = output.replace('Final clause', str(line))
-            literal = abs(int(output.split()[-1]))
-            first_clause = output[:output.find(f'ROOT {literal}\n')].count('\n')
-            second_clause = output[:output.find(f'ROOT -{literal}\n')].count('\n')
-            output = output[:output.find(f'{line}:')]
-            output += f'{line}: CHAIN {first_clause} [{literal}] {second_clause} => 0'
-        running_clause_index = output.count('\n')
-        clauses = {}
-        proof_tree = {}
-        for line in output.split('\n'):
-            number = int(line[:line.find(':')].strip())
-            if 'ROOT' in line:
-                # add a root clause to the proof tree
-                clause = Generator.get_clause(*tuple(map(int, line[line.find('ROOT') + len('ROOT'):].strip().split(' '))))
-                path = ()
+# definition of the clause store object which keeps zero terminated clauses in one flat integer buffer
+class ClauseStore:
+    def __init__(self):
+        self.literals = array('i')
+        # the position of the first literal of every clause
+        self.offsets = array('i')
+
+    # add a clause given by its literals
+    def add(self, *literals):
+        self.offsets.append(len(self.literals))
+        self.literals.extend(literals)
+        self.literals.append(0)
+
+    # return the number of clauses
+    def __len__(self):
+        return len(self.offsets)
+
+    # return every clause as sorted tuple without duplicates
+    def __iter__(self):
+        for i, start in enumerate(self.offsets):
+            end = self.offsets[i + 1] - 1 if i + 1 < len(self.offsets) else len(self.literals) - 1
+            yield Generator.get_clause(*self.literals[start:end])
+
+
+# definition of the unroller object which emits the clauses of a step 0 formula at arbitrary steps
+class Unroller:
+    def __init__(self, generator, formula):
+        self.generator = generator
+        model = generator.model
+        # transform the formula once - the labels of its connectives are only used to number them
+        first_label = model.label_running_index
+        template = generator.generate_clauses(formula, {}, False).literals
+        self.number_of_labels = model.label_running_index - first_label
+        model.label_running_index = first_label
+        # split every literal into a template value, a signed offset per step and a signed offset per label block
+        constants = {0, model.true_index, model.false_index}
+        self.template = array('i')
+        self.step_offsets = array('i')
+        self.label_offsets = array('i')
+        for literal in template:
+            sign = -1 if literal < 0 else 1
+            if abs(literal) in constants:
+                # the constants and the zero terminators are never moved
+                self.template.append(literal)
+                self.step_offsets.append(0)
+                self.label_offsets.append(0)
+            elif abs(literal) > first_label:
+                self.template.append(literal - sign * first_label)
+                self.step_offsets.append(0)
+                self.label_offsets.append(sign)
             else:
-                # add a derived clause to the proof tree
-                clause = Generator.get_clause(*tuple(map(int, line[line.find('=>') + len('=>'):].strip().split(' '))))
-                path = tuple(map(int, line[line.find('CHAIN') + len('CHAIN'):line.find('=>')].replace('[', '').replace(']', '').strip().split(' ')))
-                while len(path) > 3:
-                    # unroll chains to get single resolution steps
-                    running_clause_index += 1
-                    derived_clause = Generator.get_clause(*[x for x in clauses[path[0]] + clauses[path[2]] if abs(x) != path[1]])
-                    assert running_clause_index not in clauses
-                    clauses[running_clause_index] = derived_clause
-                    if derived_clause not in proof_tree:
-                        proof_tree[derived_clause] = (clauses[path[0]], path[1], clauses[path[2]])
-                    path = (running_clause_index,) + path[3:]
-            clause = clause if clause != (0,) else ()
-            assert number not in clauses
-            clauses[number] = clause
-            if clause not in proof_tree:
-                proof_tree[clause] = () if path == () else (clauses[path[0]], path[1], clauses[path[2]])
-        return proof_tree
-
-
-# definition of the node object which builds formulas
+                self.template.append(literal)
+                self.step_offsets.append(sign * model.maximum_variable_index)
+                self.label_offsets.append(0)
+
+    # return the flat zero terminated clauses of the formula at the passed step - the connectives get a new block of labels
+    def unroll(self, step):
+        model = self.generator.model
+        first_label = model.label_running_index
+        model.label_running_index += self.number_of_labels
+        return array('i', [literal + step_offset * step + label_offset * first_label
+                           for literal, step_offset, label_offset in zip(self.template, self.step_offsets, self.label_offsets)])
+
+
+# definition of the node object which builds formulas - structurally equal nodes are only built once
 class Node:
+    __slots__ = ('node_type', 'first_argument', 'second_argument', 'label', '__weakref__')
+    # the unique table maps the node type and the identities of the arguments or the literal label to the node
+    unique_table = WeakValueDictionary()
+
     def __init__(self, node_type, first_argument, second_argument, label):
         self.node_type = node_type
         self.first_argument = first_argument
         self.second_argument = second_argument
         self.label = label
 
-    # generates a copy of the node object
-    def get_copy(self):
-        if self.is_literal():
-            return Node.literal(self.label)
-        elif self.is_and():
-            return Node.and_formula(self.first_argument.get_copy(), self.second_argument.get_copy())
-        elif self.is_or():
-            return Node.or_formula(self.first_argument.get_copy(), self.second_argument.get_copy())
-        elif self.is_equal():
-            return Node.equal(self.first_argument.get_copy(), self.second_argument.get_copy())
-        elif self.is_not_equal():
-            return Node.not_equal(self.first_argument.get_copy(), self.second_argument.get_copy())
-        else:
-            raise NotImplementedError()
-
-    # generates a negated copy of the literal object
+    # returns the unique node with the passed type and arguments
+    @staticmethod
+    def create(node_type, first_argument, second_argument):
+        key = (node_type, id(first_argument), id(second_argument))
+        node = Node.unique_table.get(key)
+        if node is None:
+            node = Node(node_type, first_argument, second_argument, 0)
+            Node.unique_table[key] = node
+        return node
+
+    # generates a negated copy of the literal or constant object
     def get_negated_literal_copy(self):
         if self.is_literal():
             return Node.literal(self.label * -1)
+        elif self.is_true():
+            return Node.FALSE
+        elif self.is_false():
+            return Node.TRUE
 
     # checks if the object is a literal
     def is_literal(self):
-        return self.node_type == NodeType.LITERAL
+        return self.node_type is NodeType.LITERAL
 
     # checks if the object is a negative literal
     def is_negative_literal(self):
         return self.is_literal() and self.label < 0
 
-    # checks if the object is a positive literal
-    def is_positive_literal(self):
-        return self.is_literal() and self.label > 0
+    # checks if the object is the true constant
+    def is_true(self):
+        return self.node_type is NodeType.TRUE
+
+    # checks if the object is the false constant
+    def is_false(self):
+        return self.node_type is NodeType.FALSE
+
+    # checks if the object is one of the two constants
+    def is_constant(self):
+        return self.node_type is NodeType.TRUE or self.node_type is NodeType.FALSE
+
+    # checks if the object is a connective
+    def is_connective(self):
+        return self.first_argument is not None
 
     # checks if the object is an and connective
     def is_and(self):
-        return self.node_type == NodeType.AND
+        return self.node_type is NodeType.AND
 
     # checks if the object is an or connective
     def is_or(self):
-        return self.node_type == NodeType.OR
+        return self.node_type is NodeType.OR
 
     # checks if the object is an equal connective
     def is_equal(self):
-        return self.node_type == NodeType.EQUAL
+        return self.node_type is NodeType.EQUAL
 
     # checks if the object is a not equal connective
     def is_not_equal(self):
-        return self.node_type == NodeType.NOT_EQUAL
-
-    # equality check is done through the labels
-    def __eq__(self, other):
-        return self.label == other.label
+        return self.node_type is NodeType.NOT_EQUAL
 
-    # the uniqueness in hash data structures is determined by the label
-    def __hash__(self):
-        return self.label
-
-    # returns the node count of the formula object
-    def count_nodes_in_formula(self):
-        return 1 if self.is_literal() else 1 + self.first_argument.count_nodes_in_formula() + self.second_argument.count_nodes_in_formula()
-
-    # returns the formula object as string
-    def get_formula(self):
+    # checks if the two objects are complementary literals or constants
+    def is_complement_of(self, other):
         if self.is_literal():
-            return str(self.label)
-        elif self.is_and():
-            op = 'and'
-        elif self.is_or():
-            op = 'or'
-        elif self.is_equal():
-            op = 'eq'
-        elif self.is_not_equal():
-            op = 'neq'
+            return other.is_literal() and self.label == -other.label
         else:
-            raise NotImplementedError()
-        return f'({self.first_argument.get_formula()}) {op} ({self.second_argument.get_formula()})'
+            return self.is_constant() and other.is_constant() and self is not other
 
-    # creates a literal node
+    # returns the node count of the formula object where shared nodes are counted once
+    def count_nodes_in_formula(self):
+        visited = {self}
+        stack = [self]
+        while stack:
+            formula = stack.pop()
+            if formula.is_connective():
+                for argument in (formula.first_argument, formula.second_argument):
+                    if argument not in visited:
+                        visited.add(argument)
+                        stack.append(argument)
+        return len(visited)
+
+    # returns the distinct subformulas of the formula where the arguments of a connective precede it
+    def get_subformulas(self):
+        return Node.get_all_subformulas([self])
+
+    # returns the distinct subformulas of all formulas where the arguments of a connective precede it
     @staticmethod
-    def literal(label):
-        return Node(NodeType.LITERAL, None, None, label)
+    def get_all_subformulas(formulas):
+        subformulas = []
+        visited = set()
+        stack = [(formula, False) for formula in reversed(formulas)]
+        while stack:
+            formula, expanded = stack.pop()
+            if expanded:
+                subformulas.append(formula)
+            elif formula not in visited:
+                visited.add(formula)
+                if formula.is_connective():
+                    # the connective is emitted after its arguments have been emitted
+                    stack.append((formula, True))
+                    for argument in (formula.second_argument, formula.first_argument):
+                        if argument not in visited:
+                            stack.append((argument, False))
+                else:
+                    subformulas.append(formula)
+        return subformulas
 
-    # creates a literal node representing true
+    # creates a literal node
     @staticmethod
-    def true(model):
-        return Node.literal(model.true_index)
+    def literal(label):
+        node = Node.unique_table.get(label)
+        if node is None:
+            node = Node(NodeType.LITERAL, None, None, label)
+            Node.unique_table[label] = node
+        return node
 
-    # creates a literal node representing false
+    # returns the constant node representing true
     @staticmethod
-    def false(model):
-        return Node.literal(model.false_index)
+    def true(model=None):
+        return Node.TRUE
 
-    # returns a literal node list representing positive and negative true and false constants
+    # returns the constant node representing false
     @staticmethod
-    def get_constants(model):
-        return [Node.true(model), Node.false(model), Node.true(model).get_negated_literal_copy(), Node.false(model).get_negated_literal_copy()]
+    def false(model=None):
+        return Node.FALSE
 
-    # creates an and node
+    # creates an and node - constants and trivial arguments are folded
     @staticmethod
     def and_formula(*arguments):
-        if len(arguments) == 1:
-            return arguments[0]
-        else:
-            assert len(arguments) >= 2
-            ret = Node(NodeType.AND, arguments[0], arguments[1], 0)
-            for argument in arguments[2:]:
-                ret = Node.and_formula(ret, argument)
-            return ret
+        ret = arguments[0]
+        for argument in arguments[1:]:
+            if ret.is_false() or argument.is_true() or ret is argument:
+                pass
+            elif argument.is_false() or ret.is_true():
+                ret = argument
+            elif ret.is_complement_of(argument):
+                ret = Node.FALSE
+            else:
+                ret = Node.create(NodeType.AND, ret, argument)
+        return ret
 
-    # creates an or node
+    # creates an or node - constants and trivial arguments are folded
     @staticmethod
     def or_formula(*arguments):
-        if len(arguments) == 1:
-            return arguments[0]
-        else:
-            assert len(arguments) >= 2
-            ret = Node(NodeType.OR, arguments[0], arguments[1], 0)
-            for argument in arguments[2:]:
-                ret = Node.or_formula(ret, argument)
-            return ret
+        ret = arguments[0]
+        for argument in arguments[1:]:
+            if ret.is_true() or argument.is_false() or ret is argument:
+                pass
+            elif argument.is_true() or ret.is_false():
+                ret = argument
+            elif ret.is_complement_of(argument):
+                ret = Node.TRUE
+            else:
+                ret = Node.create(NodeType.OR, ret, argument)
+        return ret
 
-    # creates an equal node
+    # creates an equal node - constants and trivial arguments are folded
     @staticmethod
     def equal(*arguments):
         assert len(arguments) >= 2
-        ret = Node(NodeType.EQUAL, arguments[0], arguments[1], 0)
-        for argument in arguments[2:]:
-            ret = Node.equal(ret, argument)
+        ret = arguments[0]
+        for argument in arguments[1:]:
+            ret = Node.fold(NodeType.EQUAL, ret, argument, Node.TRUE, Node.FALSE)
         return ret
 
-    # creates a not equal node
+    # creates a not equal node - constants and trivial arguments are folded
     @staticmethod
     def not_equal(*arguments):
         assert len(arguments) >= 2
-        ret = Node(NodeType.NOT_EQUAL, arguments[0], arguments[1], 0)
-        for argument in arguments[2:]:
-            ret = Node.not_equal(ret, argument)
+        ret = arguments[0]
+        for argument in arguments[1:]:
+            ret = Node.fold(NodeType.NOT_EQUAL, ret, argument, Node.FALSE, Node.TRUE)
         return ret
+
+    # creates an equal or not equal node where the neutral constant keeps and the absorbing constant negates the other argument
+    @staticmethod
+    def fold(node_type, first_argument, second_argument, neutral, absorbing):
+        if first_argument is second_argument:
+            return absorbing.get_negated_literal_copy()
+        elif first_argument.is_complement_of(second_argument):
+            return absorbing
+        elif first_argument is neutral:
+            return second_argument
+        elif second_argument is neutral:
+            return first_argument
+        elif first_argument is absorbing and not second_argument.is_connective():
+            return second_argument.get_negated_literal_copy()
+        elif second_argument is absorbing and not first_argument.is_connective():
+            return first_argument.get_negated_literal_copy()
+        else:
+            return Node.create(node_type, first_argument, second_argument)
+
+
+# the two constants are kept alive for the whole run
+Node.TRUE = Node(NodeType.TRUE, None, None, 0)
+Node.FALSE = Node(NodeType.FALSE, None, None, 0)
@@ -0,0 +1,28 @@
+from dimacs_generator import Node
+
+
+# definition of the fixpoint object which accumulates the over-approximation of the reachable states at one bound
+class Fixpoint:
+    def __init__(self, generator, solver, simplifier):
+        self.generator = generator
+        self.solver = solver
+        self.simplifier = simplifier
+        # the reachable states start with the initial states and are kept as one shared formula
+        self.reachable_formula = generator.initial()
+        # the formula of the last containment check
+        self.containment_formula = None
+
+    # return true if the states of the formula are already reachable - the reachable states are closed under the
+    # transitions if they contain the image that the interpolant over-approximates
+    def contains(self, formula):
+        model = self.generator.model
+        self.containment_formula = Node.and_formula(formula, Node.not_equal(self.reachable_formula, Node.TRUE))
+        # the labels of the check are released afterwards, so the check does not change the numbering of later encodings
+        first_label = model.label_running_index
+        contained = not self.solver.solve(self.generator.generate_clauses(self.containment_formula, {}))
+        model.label_running_index = first_label
+        return contained
+
+    # add the states of the formula to the reachable states
+    def add(self, formula):
+        self.reachable_formula = self.simplifier.simplify(Node.or_formula(self.reachable_formula, formula))
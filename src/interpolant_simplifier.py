@@ -0,0 +1,141 @@
+from random import Random
+
+from dimacs_generator import Node
+
+
+# definition of the interpolant simplifier object which keeps the interpolants and the reachable state formula small
+class InterpolantSimplifier:
+    # the number of random assignments that are simulated at once, the equivalence checks tried per node and the
+    # refuted checks after which a simplification stops sweeping
+    WIDTH = 256
+    CANDIDATES = 4
+    FAILURES = 64
+
+    def __init__(self, generator, solver):
+        self.generator = generator
+        self.solver = solver
+        self.random = Random(0)
+        self.mask = (1 << InterpolantSimplifier.WIDTH) - 1
+        # the simulated values of the nodes under the random assignments to their variables
+        self.patterns = {}
+        self.signatures = {}
+        # the simplified formulas of earlier simplifications are not swept again
+        self.simplified_formulas = {}
+        self.failures = 0
+
+    # return an equivalent formula - the node constructors already hash and fold, the rewriting propagates literals
+    # and the sweeping merges nodes that the sat solver proves equivalent
+    def simplify(self, formula):
+        replacements = {}
+        # the simplified nodes are hashed by their simulated values to find candidates for a merge
+        candidates = {}
+        self.failures = 0
+        for subformula in formula.get_subformulas():
+            if subformula in self.simplified_formulas:
+                simplified_formula = self.simplified_formulas[subformula]
+            elif subformula.is_connective():
+                simplified_formula = self.rewrite(subformula, replacements[subformula.first_argument], replacements[subformula.second_argument])
+                if simplified_formula.is_connective():
+                    simplified_formula = self.sweep(simplified_formula, candidates)
+            else:
+                simplified_formula = subformula
+            replacements[subformula] = simplified_formula
+        # the values of the nodes are only kept during one simplification
+        self.signatures = {}
+        for subformula, simplified_formula in replacements.items():
+            self.simplified_formulas[subformula] = simplified_formula
+            self.simplified_formulas[simplified_formula] = simplified_formula
+        return replacements[formula]
+
+    # return the connective of the arguments where absorbed arguments are removed and literals are propagated
+    @staticmethod
+    def rewrite(formula, first_argument, second_argument):
+        if formula.is_and():
+            for argument, other_argument in ((first_argument, second_argument), (second_argument, first_argument)):
+                if other_argument.is_and() and (argument is other_argument.first_argument or argument is other_argument.second_argument):
+                    return other_argument
+                elif other_argument.is_and() and (argument.is_complement_of(other_argument.first_argument) or
+                                                  argument.is_complement_of(other_argument.second_argument)):
+                    return Node.FALSE
+                elif other_argument.is_or() and (argument is other_argument.first_argument or argument is other_argument.second_argument):
+                    return argument
+                elif other_argument.is_or() and argument.is_complement_of(other_argument.first_argument):
+                    return Node.and_formula(argument, other_argument.second_argument)
+                elif other_argument.is_or() and argument.is_complement_of(other_argument.second_argument):
+                    return Node.and_formula(argument, other_argument.first_argument)
+            return Node.and_formula(first_argument, second_argument)
+        elif formula.is_or():
+            for argument, other_argument in ((first_argument, second_argument), (second_argument, first_argument)):
+                if other_argument.is_or() and (argument is other_argument.first_argument or argument is other_argument.second_argument):
+                    return other_argument
+                elif other_argument.is_or() and (argument.is_complement_of(other_argument.first_argument) or
+                                                 argument.is_complement_of(other_argument.second_argument)):
+                    return Node.TRUE
+                elif other_argument.is_and() and (argument is other_argument.first_argument or argument is other_argument.second_argument):
+                    return argument
+                elif other_argument.is_and() and argument.is_complement_of(other_argument.first_argument):
+                    return Node.or_formula(argument, other_argument.second_argument)
+                elif other_argument.is_and() and argument.is_complement_of(other_argument.second_argument):
+                    return Node.or_formula(argument, other_argument.first_argument)
+            return Node.or_formula(first_argument, second_argument)
+        elif formula.is_equal():
+            return Node.equal(first_argument, second_argument)
+        else:
+            return Node.not_equal(first_argument, second_argument)
+
+    # return a constant or an earlier node with the same simulated values if the sat solver proves the equivalence
+    def sweep(self, formula, candidates):
+        signature = self.simulate(formula)
+        if self.failures > InterpolantSimplifier.FAILURES:
+            return formula
+        # the values of wide conjunctions and disjunctions are mostly constant, so they are only checked against the constants
+        if signature == 0:
+            return Node.FALSE if self.is_equivalent(formula, Node.FALSE) else formula
+        elif signature == self.mask:
+            return Node.TRUE if self.is_equivalent(formula, Node.TRUE) else formula
+        signature_candidates = candidates.setdefault(signature, [])
+        for candidate in signature_candidates[:InterpolantSimplifier.CANDIDATES]:
+            if self.is_equivalent(formula, candidate):
+                return candidate
+        signature_candidates.append(formula)
+        return formula
+
+    # return the simulated values of a node under the random assignments
+    def simulate(self, formula):
+        if formula in self.signatures:
+            return self.signatures[formula]
+        for subformula in formula.get_subformulas():
+            if subformula in self.signatures:
+                continue
+            if subformula.is_literal():
+                variable = abs(subformula.label)
+                if variable not in self.patterns:
+                    self.patterns[variable] = self.random.getrandbits(InterpolantSimplifier.WIDTH)
+                signature = self.patterns[variable] ^ self.mask if subformula.is_negative_literal() else self.patterns[variable]
+            elif subformula.is_true():
+                signature = self.mask
+            elif subformula.is_false():
+                signature = 0
+            else:
+                first_signature = self.signatures[subformula.first_argument]
+                second_signature = self.signatures[subformula.second_argument]
+                if subformula.is_and():
+                    signature = first_signature & second_signature
+                elif subformula.is_or():
+                    signature = first_signature | second_signature
+                elif subformula.is_equal():
+                    signature = first_signature ^ second_signature ^ self.mask
+                else:
+                    signature = first_signature ^ second_signature
+            self.signatures[subformula] = signature
+        return self.signatures[formula]
+
+    # return true if the sat solver proves the two formulas equivalent - the labels of the check are released afterwards
+    def is_equivalent(self, formula, other_formula):
+        model = self.generator.model
+        first_label = model.label_running_index
+        equivalent = not self.solver.solve(self.generator.generate_clauses(Node.not_equal(formula, other_formula), {}))
+        model.label_running_index = first_label
+        if not equivalent:
+            self.failures += 1
+        return equivalent
@@ -0,0 +1,56 @@
+from dimacs_generator import ClauseStore, Generator
+
+
+# definition of the interpolation object which keeps the clauses of the second formula for all checks at one bound
+class Interpolation:
+    def __init__(self, unrolling, solver, bound):
+        self.model = unrolling.model
+        self.generator = unrolling.generator
+        self.solver = solver
+        # only the initial formula of the first clause set changes between the checks
+        self.first_clauses = unrolling.first_clauses()
+        self.second_clauses = unrolling.second_clauses(bound)
+        self.second_variables = Generator.get_variables(self.second_clauses)
+        # the definitions of the connectives in the initial formulas are kept with the polarities they are encoded in
+        self.definitions = set()
+        self.encoded = {}
+        self.proof = None
+        # an incremental solver keeps both clause sets and switches the assertions of the initial formula by an activation literal
+        self.activation = None
+        self.session = solver.open_session()
+        if self.session is not None:
+            self.session.add_clauses(self.first_clauses.union(self.second_clauses))
+
+    # return the interpolant of the initial formula with the first clause set and the second clause set or none if they are satisfiable
+    def interpolate(self, initial_formula):
+        labels = self.model.labels
+        assertions = ClauseStore()
+        definitions = ClauseStore()
+        # only the connectives that are new or occur in a new polarity are encoded
+        self.generator.add_definitions_to_clauses(self.generator.add_assertions_to_clauses(initial_formula, assertions, labels), definitions, labels, self.encoded)
+        if self.session is None:
+            self.definitions.update(definitions)
+            first_clauses = self.first_clauses.union(self.definitions, assertions)
+            satisfiable, self.proof = self.solver.solve_with_proof(first_clauses.union(self.second_clauses))
+        else:
+            # the definitions only constrain their labels and stay active while the old assertions are switched off
+            clauses = list(definitions)
+            if self.activation is not None:
+                clauses.append((-self.activation,))
+            self.model.label_running_index += 1
+            self.activation = self.model.label_running_index
+            clauses.extend(Generator.get_clause(-self.activation, *clause) for clause in assertions)
+            self.first_clauses.update(clauses)
+            self.session.add_clauses(clauses)
+            satisfiable = self.session.solve([self.activation])
+            self.proof = self.session.proof
+            first_clauses = self.first_clauses
+        if satisfiable:
+            return None
+        # the activation literal in the clause that refutes it is local to the first clause set
+        return self.generator.compute_interpolant(first_clauses, self.second_clauses, self.proof, self.second_variables)
+
+    # release the incremental solver
+    def close(self):
+        if self.session is not None:
+            self.session.close()
@@ -0,0 +1,94 @@
+from array import array
+
+from aiger_parser import Model
+
+
+# definition of the model reducer object which removes the logic outside the cone of influence of the checked outputs
+# and replaces the latches that are known to be constant by their constant and the equivalent variables by their representative
+class ModelReducer:
+    def __init__(self, model, outputs=None, constants=None, free_latches=None, equivalences=None):
+        self.model = model
+        self.outputs = [0] if outputs is None else outputs
+        # the constant latches are mapped from their variable to the constant aiger literal
+        self.constants = {} if constants is None else constants
+        # the variables of the latches that are abstracted to inputs which take any value at every step
+        self.free_latches = set() if free_latches is None else free_latches
+        # the merged variables are mapped to the aiger literal of their representative which is not merged itself or
+        # merged with an earlier variable
+        self.equivalences = {} if equivalences is None else equivalences
+
+    # return a mark for every variable in the transitive fan-in of the checked outputs through and gates and latch next state functions
+    def cone_of_influence(self):
+        model = self.model
+        # index the and gates and latches by the variable they define
+        and_gates = array('i', [-1]) * (model.maximum_variable_index + 1)
+        for i, literal in enumerate(model.and_gate_literals):
+            and_gates[literal >> 1] = i
+        latches = array('i', [-1]) * (model.maximum_variable_index + 1)
+        for i, literal in enumerate(model.latch_literals):
+            latches[literal >> 1] = i
+        cone = bytearray(model.maximum_variable_index + 1)
+        stack = [model.output_literals[i] >> 1 for i in self.outputs]
+        while stack:
+            variable = stack.pop()
+            # the variable 0 is the constant and the constant latches are not needed
+            if variable == 0 or cone[variable] or variable in self.constants:
+                continue
+            # the logic of a merged variable is replaced by the logic of its representative
+            if variable in self.equivalences:
+                stack.append(self.equivalences[variable] >> 1)
+                continue
+            cone[variable] = 1
+            if and_gates[variable] >= 0:
+                stack.append(model.and_gate_first_inputs[and_gates[variable]] >> 1)
+                stack.append(model.and_gate_second_inputs[and_gates[variable]] >> 1)
+            elif latches[variable] >= 0 and variable not in self.free_latches:
+                stack.append(model.latch_next_literals[latches[variable]] >> 1)
+        return cone
+
+    # return a model with the logic in the cone of influence where the remaining variables are numbered consecutively
+    def reduce(self, bound):
+        model = self.model
+        cone = self.cone_of_influence()
+        reduced_model = Model()
+        # the constant keeps the variable 0 and the removed variables are mapped to it
+        variables = array('i', [0]) * (model.maximum_variable_index + 1)
+        reduced_model.original_variables = array('i', [0])
+        # the free latches are numbered and listed after the inputs
+        free_latch_literals = array('i', [literal for literal in model.latch_literals if literal >> 1 in self.free_latches])
+        latch_literals = array('i', [literal for literal in model.latch_literals if literal >> 1 not in self.free_latches])
+        for literals in (model.input_literals, free_latch_literals, latch_literals, model.and_gate_literals):
+            for literal in literals:
+                if cone[literal >> 1]:
+                    variables[literal >> 1] = len(reduced_model.original_variables)
+                    reduced_model.original_variables.append(literal >> 1)
+
+        # translate an aiger literal of the model to the reduced model
+        def translate(literal):
+            if literal >> 1 in self.constants:
+                return self.constants[literal >> 1] ^ (literal & 1)
+            if literal >> 1 in self.equivalences:
+                return translate(self.equivalences[literal >> 1]) ^ (literal & 1)
+            return (variables[literal >> 1] << 1) | (literal & 1)
+
+        for literal in model.input_literals + free_latch_literals:
+            if cone[literal >> 1]:
+                reduced_model.input_literals.append(translate(literal))
+        for literal, next_literal in zip(model.latch_literals, model.latch_next_literals):
+            if cone[literal >> 1] and literal >> 1 not in self.free_latches:
+                reduced_model.latch_literals.append(translate(literal))
+                reduced_model.latch_next_literals.append(translate(next_literal))
+        for i in self.outputs:
+            reduced_model.output_literals.append(translate(model.output_literals[i]))
+        for literal, first_input, second_input in zip(model.and_gate_literals, model.and_gate_first_inputs, model.and_gate_second_inputs):
+            if cone[literal >> 1]:
+                reduced_model.and_gate_literals.append(translate(literal))
+                reduced_model.and_gate_first_inputs.append(translate(first_input))
+                reduced_model.and_gate_second_inputs.append(translate(second_input))
+        reduced_model.maximum_variable_index = len(reduced_model.original_variables) - 1
+        reduced_model.number_of_inputs = len(reduced_model.input_literals)
+        reduced_model.number_of_latches = len(reduced_model.latch_literals)
+        reduced_model.number_of_outputs = len(reduced_model.output_literals)
+        reduced_model.number_of_and_gates = len(reduced_model.and_gate_literals)
+        reduced_model.set_label_indices(bound)
+        return reduced_model
@@ -0,0 +1,153 @@
+from array import array
+from heapq import heappop, heappush
+
+from aiger_parser import Node
+from sat_solver import ProcessSession
+
+
+# definition of the property directed reachability object which blocks the cubes of latch values that reach a bad state
+# in a sequence of frames - every frame over-approximates the states reachable within its number of steps
+class PropertyDirectedReachability:
+    def __init__(self, unrolling, solver):
+        # the relative induction checks only need the gates of one step and the transition to the next one
+        unrolling.extend(1)
+        self.model = unrolling.model
+        generator = unrolling.generator
+        # the latch labels of step 0 are the current state and the same labels of step 1 are the next state
+        self.latches = [abs(generator.get_label(latch)) for latch in self.model.latches]
+        self.offset = self.model.maximum_variable_index
+        self.bad = unrolling.safety_clause(0, 0)[0]
+        # one incremental solver keeps all frames - without the solver library every check is passed to a new solver process
+        self.session = solver.open_session(False) or ProcessSession(solver)
+        self.session.add_clauses(array('i', [self.model.true_index, 0, -self.model.false_index, 0]))
+        self.session.add_clauses(unrolling.equivalence_steps[0])
+        self.session.add_clauses(unrolling.transition_steps[0])
+        # the blocked cubes of every frame and the activation literals that switch on their clauses - a cube is only kept in
+        # the highest frame it is blocked in, so a frame consists of the cubes of its own and all higher frames
+        self.frames = []
+        self.activations = []
+        # the first frame holds the initial states where all latches are zero
+        self.add_frame()
+        self.session.add_clauses(array('i', [value for latch in self.latches for value in (-self.activations[0], -latch, 0)]))
+        self.add_frame()
+        # the literals of the cube that the last successful relative induction check needs and the level of the frame
+        # that is found to be inductive
+        self.core = None
+        self.invariant_level = None
+
+    # add a new frame at the end without any blocked cubes
+    def add_frame(self):
+        self.model.label_running_index += 1
+        self.activations.append(self.model.label_running_index)
+        self.frames.append([])
+
+    # return the activation literals of the frame at the level
+    def get_assumptions(self, level):
+        return [self.activations[0]] if level == 0 else self.activations[level:]
+
+    # return the cube of the latch values of the last satisfiable check
+    def get_cube(self):
+        values = self.session.get_model(self.offset)
+        return tuple(latch if values[latch - 1] else -latch for latch in self.latches)
+
+    # return the literal of the next state
+    def get_next(self, literal):
+        return literal + self.offset if literal > 0 else literal - self.offset
+
+    # return true if the frame at the level contains a bad state
+    def has_bad_state(self, level):
+        return self.session.solve(self.get_assumptions(level) + [self.bad])
+
+    # return true if the cube has no successor in itself that starts in the frame at the level outside of the cube - the
+    # literals of the cube that this check needs are kept
+    def is_inductive(self, cube, level):
+        self.model.label_running_index += 1
+        activation = self.model.label_running_index
+        self.session.add_clauses(array('i', [-activation] + [-literal for literal in cube] + [0]))
+        next_literals = [self.get_next(literal) for literal in cube]
+        satisfiable = self.session.solve(self.get_assumptions(level) + [activation] + next_literals)
+        if not satisfiable:
+            conflict = set(self.session.get_conflict(len(cube) + len(self.activations) + 1))
+            self.core = tuple(literal for literal, next_literal in zip(cube, next_literals) if next_literal in conflict)
+        # the clause that excludes the cube is switched off for the later checks
+        self.session.add_clauses(array('i', [-activation, 0]))
+        return not satisfiable
+
+    # return true if the cube contains no initial state - the initial states set all latches to zero
+    @staticmethod
+    def excludes_initial_state(cube):
+        return any(literal > 0 for literal in cube)
+
+    # return a smaller cube that is still inductive relative to the frame at the level - the cube is inductive already
+    def generalize(self, cube, level):
+        # the literals that the relative induction check needs are kept together with one that excludes the initial states
+        core = self.core
+        if not PropertyDirectedReachability.excludes_initial_state(core):
+            core += (next(literal for literal in cube if literal > 0),)
+        cube = tuple(literal for literal in cube if literal in core)
+        # every literal that can be dropped is removed
+        for literal in list(cube):
+            if literal not in cube:
+                continue
+            smaller_cube = tuple(other for other in cube if other != literal)
+            if PropertyDirectedReachability.excludes_initial_state(smaller_cube) and self.is_inductive(smaller_cube, level):
+                core = self.core if PropertyDirectedReachability.excludes_initial_state(self.core) else smaller_cube
+                cube = tuple(other for other in smaller_cube if other in core)
+        return cube
+
+    # block the cube in the frame at the level and all lower frames - a cube that is blocked there already is not added again
+    def add_blocked_cube(self, cube, level):
+        if any(cube in frame for frame in self.frames[level:]):
+            return
+        self.frames[level].append(cube)
+        self.session.add_clauses(array('i', [-self.activations[level]] + [-literal for literal in cube] + [0]))
+
+    # block all bad states in the frame at the level and return false if one of them is reachable from the initial states
+    def block_bad_states(self, level):
+        while self.has_bad_state(level):
+            # the obligations to block a cube at a level are handled from the lowest level on
+            obligations = [(level, 0, self.get_cube())]
+            count = 1
+            while obligations:
+                obligation_level, _, cube = obligations[0]
+                if obligation_level == 0:
+                    return False
+                if self.is_inductive(cube, obligation_level - 1):
+                    heappop(obligations)
+                    cube = self.generalize(cube, obligation_level - 1)
+                    # the cube is blocked in the highest frame in which it is still inductive
+                    while obligation_level < level and self.is_inductive(cube, obligation_level):
+                        obligation_level += 1
+                    self.add_blocked_cube(cube, obligation_level)
+                else:
+                    # the predecessor in the lower frame has to be blocked first
+                    heappush(obligations, (obligation_level - 1, count, self.get_cube()))
+                    count += 1
+        return True
+
+    # push the blocked cubes to the next frame if they are inductive relative to their frame and return true if a frame
+    # is the same as the next one, which makes it an inductive invariant
+    def propagate(self):
+        self.add_frame()
+        for level in range(1, len(self.frames) - 1):
+            for cube in list(self.frames[level]):
+                if self.is_inductive(cube, level):
+                    self.frames[level].remove(cube)
+                    self.add_blocked_cube(cube, level + 1)
+            if not self.frames[level]:
+                self.invariant_level = level + 1
+                return True
+        return False
+
+    # return the number of blocked cubes in all frames
+    def count_cubes(self):
+        return sum(len(frame) for frame in self.frames)
+
+    # return the inductive frame as formula over the variables of the model
+    def get_invariant(self):
+        clauses = [Node.or_formula(Node.FALSE, *(Node.literal(-literal) for literal in cube)) for frame in self.frames[self.invariant_level:] for cube in frame]
+        return Node.and_formula(Node.TRUE, *clauses)
+
+    # release the incremental solver
+    def close(self):
+        self.session.close()
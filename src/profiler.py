@@ -0,0 +1,141 @@
+import json
+from array import array
+from resource import getrusage, RUSAGE_CHILDREN, RUSAGE_SELF
+from time import perf_counter
+
+from aiger_parser import Parser
+from dimacs_generator import ClauseStore, Generator
+from interpolant_simplifier import InterpolantSimplifier
+from interpolation import Interpolation
+from model_reducer import ModelReducer
+from proof import Proof
+from property_checker import PropertyChecker
+from sat_solver import LibrarySolver, SatSolver, SolverSession
+from simulator import Simulator
+from sweeper import Sweeper
+from unrolling import Unrolling
+
+
+# definition of the profiler object which records the time, the sizes and the peak memory growth of every phase at every bound
+# as json lines - the phases are only wrapped while the profiler is installed, so a run without it is not slowed down
+class Profiler:
+    def __init__(self, file):
+        self.file = file
+        # the bound of the current check and the totals of the phases at this bound in the order they first occur
+        self.bound = None
+        self.phases = {}
+        # the phases that are running, so a phase that calls itself is only counted once
+        self.active = set()
+        self.originals = []
+
+    # wrap the functions of all phases
+    def install(self):
+        count_model = Profiler.count_model
+        count_clauses = Profiler.count_clauses
+        # the functions with a bound argument start the phases of a new bound
+        self.wrap(Simulator, 'find_failure', 'simulation', bound_argument=1)
+        self.wrap(Unrolling, 'bounded_model_checking_clauses', 'unrolling', bound_argument=1, counts=lambda arguments, result: count_clauses(result))
+        self.wrap(Unrolling, 'induction_clauses', 'unrolling', bound_argument=1, counts=lambda arguments, result: count_clauses(result))
+        self.wrap(Interpolation, '__init__', 'interpolation_setup', bound_argument=3,
+                  counts=lambda arguments, result: count_clauses(arguments[0].second_clauses))
+        self.wrap(PropertyChecker, 'is_reachable', 'property_check', bound_argument=2)
+        self.wrap(Parser, 'parse', 'parse', counts=lambda arguments, result: count_model(result))
+        self.wrap(ModelReducer, 'reduce', 'reduce', counts=lambda arguments, result: count_model(result))
+        self.wrap(Simulator, 'find_constant_latches', 'ternary_simulation', counts=lambda arguments, result: {'constant_latches': len(result)})
+        self.wrap(Sweeper, 'sweep', 'sweeping', counts=lambda arguments, result: {'merged_variables': len(result)})
+        self.wrap(Unrolling, 'reserve', 'reserve')
+        self.wrap(Generator, 'step_equivalences', 'formula')
+        self.wrap(Generator, 'transition_formula', 'formula')
+        self.wrap(Generator, 'initial', 'formula')
+        self.wrap(Generator, 'generate_clauses', 'generate_clauses', counts=lambda arguments, result: count_clauses(result))
+        self.wrap(Generator, 'get_dimacs', 'dimacs', counts=lambda arguments, result: {'bytes': len(result)})
+        self.wrap(Generator, 'compute_interpolant', 'compute_interpolant', counts=lambda arguments, result: {'nodes': result.count_nodes_in_formula()})
+        self.wrap(Proof, 'read', 'proof', counts=lambda arguments, result: {'nodes': len(result.variables)})
+        self.wrap(InterpolantSimplifier, 'simplify', 'simplify', counts=lambda arguments, result: {'nodes': result.count_nodes_in_formula()})
+        for solver in (SatSolver, LibrarySolver):
+            self.wrap(solver, 'solve', 'solve', counts=lambda arguments, result: count_clauses(arguments[1]))
+            self.wrap(solver, 'solve_with_proof', 'solve', counts=lambda arguments, result: count_clauses(arguments[1]))
+            self.wrap(solver, 'solve_with_model', 'solve', counts=lambda arguments, result: count_clauses(arguments[1]))
+        self.wrap(SolverSession, 'add_clauses', 'add_clauses', counts=lambda arguments, result: count_clauses(arguments[1]))
+        self.wrap(SolverSession, 'solve', 'solve')
+
+    # replace the function of the class by one that records its calls in the phase - the counts are computed from the
+    # arguments and the result of a call
+    def wrap(self, owner, name, phase, bound_argument=None, counts=None):
+        original = owner.__dict__[name]
+        static = isinstance(original, staticmethod)
+        function = original.__func__ if static else original
+
+        def wrapper(*arguments, **keywords):
+            if bound_argument is not None and len(arguments) > bound_argument - static:
+                self.set_bound(arguments[bound_argument - static])
+            if phase in self.active:
+                return function(*arguments, **keywords)
+            self.active.add(phase)
+            try:
+                start_rss = Profiler.get_peak_rss()
+                start_time = perf_counter()
+                result = function(*arguments, **keywords)
+                seconds = perf_counter() - start_time
+                end_rss = Profiler.get_peak_rss()
+            finally:
+                self.active.discard(phase)
+            # the peak memory only grows, so a phase is charged with the amount by which it has raised the peak
+            growth = {'peak_rss_growth_kb': end_rss[0] - start_rss[0], 'solver_peak_rss_growth_kb': end_rss[1] - start_rss[1]}
+            self.add(phase, seconds, {**growth, **({} if counts is None else counts(arguments, result))})
+            return result
+
+        setattr(owner, name, staticmethod(wrapper) if static else wrapper)
+        self.originals.append((owner, name, original))
+
+    # write the phases of the last bound if a new bound starts
+    def set_bound(self, bound):
+        if bound != self.bound:
+            self.write()
+            self.bound = bound
+
+    # add a call to the totals of the phase
+    def add(self, phase, seconds, counts):
+        totals = self.phases.setdefault(phase, {'calls': 0, 'seconds': 0.0})
+        totals['calls'] += 1
+        totals['seconds'] += seconds
+        # the variables are the largest variable of all calls and the other counts are summed up
+        for name, count in counts.items():
+            totals[name] = max(totals.get(name, 0), count) if name == 'variables' else totals.get(name, 0) + count
+
+    # write the totals of every phase at the current bound together with the peak memory that the checker and the solver
+    # processes have reached since the start of the process
+    def write(self):
+        process_rss, solver_rss = Profiler.get_peak_rss()
+        for phase, totals in self.phases.items():
+            record = {'bound': self.bound, 'phase': phase, **totals, 'process_peak_rss_kb': process_rss, 'solver_process_peak_rss_kb': solver_rss}
+            record['seconds'] = round(record['seconds'], 6)
+            self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+        self.phases = {}
+
+    # write the last phases and restore the original functions
+    def close(self):
+        self.write()
+        for owner, name, original in reversed(self.originals):
+            setattr(owner, name, original)
+        self.originals = []
+
+    # return the peak memory of the checker and of the largest solver process in kilobytes
+    @staticmethod
+    def get_peak_rss():
+        return getrusage(RUSAGE_SELF).ru_maxrss, getrusage(RUSAGE_CHILDREN).ru_maxrss
+
+    # return the sizes of a model
+    @staticmethod
+    def count_model(model):
+        return {'variables': model.maximum_variable_index, 'latches': model.number_of_latches, 'and_gates': model.number_of_and_gates}
+
+    # return the number of clauses and the largest variable of flat zero terminated clauses, a clause store or a collection of clauses
+    @staticmethod
+    def count_clauses(clauses):
+        if isinstance(clauses, ClauseStore):
+            return {'clauses': len(clauses), 'variables': max(map(abs, clauses.literals), default=0)}
+        elif isinstance(clauses, array):
+            return {'clauses': clauses.count(0), 'variables': max(map(abs, clauses), default=0)}
+        return {'clauses': len(clauses), 'variables': max((abs(literal) for clause in clauses for literal in clause), default=0)}
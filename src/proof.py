@@ -0,0 +1,110 @@
+from array import array
+
+from dimacs_generator import Generator
+
+
+# definition of the proof object which stores a resolution proof as binary resolution steps with integer ids
+class Proof:
+    def __init__(self):
+        # every clause id of the solver is mapped to the node of its last resolution step
+        self.nodes = array('i')
+        # every node is either a root clause or resolves two earlier nodes on a variable
+        self.first_parents = array('i')
+        self.variables = array('i')
+        self.second_parents = array('i')
+        self.roots = {}
+        # the clause id of the goal if it is not the last derived clause
+        self.goal = None
+
+    # add a root clause given by dimacs literals
+    def add_root(self, literals):
+        node = len(self.variables)
+        self.first_parents.append(-1)
+        self.variables.append(0)
+        self.second_parents.append(-1)
+        self.roots[node] = Generator.get_clause(*literals)
+        self.nodes.append(node)
+
+    # add a derived clause given by a chain of clause ids and the variables resolved on between them
+    def add_chain(self, clause_ids, variables):
+        node = self.nodes[clause_ids[0]]
+        for variable, clause_id in zip(variables, clause_ids[1:]):
+            # unroll chains to get single resolution steps
+            self.first_parents.append(node)
+            self.variables.append(variable)
+            self.second_parents.append(self.nodes[clause_id])
+            node = len(self.variables) - 1
+        self.nodes.append(node)
+
+    # return the node of the goal which is the empty clause derived last by default
+    def get_goal(self):
+        return self.nodes[-1 if self.goal is None else self.goal]
+
+    # return a mark for every node from which the goal is derived - parents always precede their children
+    def get_needed_nodes(self):
+        needed = bytearray(len(self.variables))
+        needed[self.get_goal()] = 1
+        for node in range(len(self.variables) - 1, -1, -1):
+            if needed[node] and self.first_parents[node] >= 0:
+                needed[self.first_parents[node]] = 1
+                needed[self.second_parents[node]] = 1
+        return needed
+
+    # return the variables of the root clauses from which the goal is derived
+    def get_needed_variables(self):
+        needed = self.get_needed_nodes()
+        return {abs(literal) for node, clause in self.roots.items() if needed[node] for literal in clause}
+
+    # return the number of clauses the goal is derived from
+    def count_nodes(self):
+        return sum(self.get_needed_nodes())
+
+    # return the resolution steps from the root clauses to the goal where shared steps are counted repeatedly
+    def count_steps(self):
+        steps = [0] * len(self.variables)
+        for node in range(len(self.variables)):
+            if self.first_parents[node] >= 0:
+                steps[node] = 1 + steps[self.first_parents[node]] + steps[self.second_parents[node]]
+        return steps[self.get_goal()]
+
+    # return the proof of a binary proof trace written by the proof logging solver
+    @staticmethod
+    def read(trace):
+        proof = Proof()
+        position = 0
+        while position < len(trace):
+            value, position = Proof.decode(trace, position)
+            if value & 1 == 0:
+                # a root clause stores its first literal index followed by the differences to the next ones
+                indices = [value >> 1]
+                value, position = Proof.decode(trace, position)
+                while value != 0:
+                    indices.append(indices[-1] + value)
+                    value, position = Proof.decode(trace, position)
+                proof.add_root([-(index >> 1) - 1 if index & 1 else (index >> 1) + 1 for index in indices])
+            else:
+                # a chain stores the distances of its clauses to the current id and the variables resolved on
+                clause_id = len(proof.nodes)
+                clause_ids = [clause_id - (value >> 1)]
+                variables = []
+                value, position = Proof.decode(trace, position)
+                while value != 0:
+                    variables.append(value)
+                    value, position = Proof.decode(trace, position)
+                    clause_ids.append(clause_id - value)
+                    value, position = Proof.decode(trace, position)
+                # a chain without variables marks a deleted clause and introduces no new clause
+                if variables:
+                    proof.add_chain(clause_ids, variables)
+        return proof
+
+    # decode an unsigned number whose byte length is stored in the high bits of the first byte
+    @staticmethod
+    def decode(trace, position):
+        first_byte = trace[position]
+        if first_byte < 0x80:
+            return first_byte, position + 1
+        length = (first_byte & 0x60) >> 5
+        if length == 3:
+            return int.from_bytes(trace[position + 1:position + 9], 'big'), position + 9
+        return int.from_bytes(trace[position:position + length + 2], 'big') & ((0x20 << (8 * (length + 1))) - 1), position + length + 2
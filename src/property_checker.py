@@ -0,0 +1,66 @@
+from array import array
+
+
+# definition of the property checker object which checks all outputs of a model in one unrolling
+class PropertyChecker:
+    def __init__(self, unrolling, solver, bound):
+        self.unrolling = unrolling
+        self.solver = solver
+        self.bound = bound
+        # the labels of all steps are fixed before the solver gets the first clauses, but the steps are only unrolled when they are checked
+        if bound > unrolling.capacity:
+            unrolling.reserve(bound)
+        # the outputs that are not decided yet and the step at which every decided output reaches a bad state
+        self.undecided = list(range(unrolling.model.number_of_outputs))
+        self.failures = {}
+        # the last step at which all outputs have been checked
+        self.checked_step = -1
+        # the values of the variables of all steps up to the first bad state of every failing output
+        self.models = {}
+        # an incremental solver keeps the unrolled steps and switches the safety clause of every check by an activation literal
+        self.literals = array('i')
+        self.session = solver.open_session(False)
+
+    # check the outputs step by step and return the step at which every failing output first reaches a bad state
+    def check(self):
+        for step in range(self.bound + 1):
+            if not self.undecided:
+                break
+            self.solver.budget.check()
+            clauses = self.unrolling.step_clauses(step)
+            if self.session is None:
+                self.literals.extend(clauses)
+            else:
+                self.session.add_clauses(clauses)
+            # the decided outputs are dropped from the checks at later steps
+            for output in list(self.undecided):
+                if self.is_reachable(output, step):
+                    self.failures[output] = step
+                    self.undecided.remove(output)
+            self.checked_step = step
+        return self.failures
+
+    # return true if the output reaches a bad state at the step - it is safe at all earlier steps
+    def is_reachable(self, output, step):
+        safety_clause = self.unrolling.safety_clause(step, step, output)
+        model = self.unrolling.model
+        # the variables of the model at the steps up to the checked one
+        size = model.maximum_variable_index * (step + 1)
+        if self.session is None:
+            satisfiable, values = self.solver.solve_with_model(self.literals + safety_clause, size)
+        else:
+            model.label_running_index += 1
+            activation = model.label_running_index
+            self.session.add_clauses(array('i', [-activation]) + safety_clause)
+            satisfiable = self.session.solve([activation])
+            values = self.session.get_model(size) if satisfiable else None
+            # the safety clause is switched off for the later checks
+            self.session.add_clauses(array('i', [-activation, 0]))
+        if satisfiable:
+            self.models[output] = values
+        return satisfiable
+
+    # release the incremental solver
+    def close(self):
+        if self.session is not None:
+            self.session.close()
@@ -0,0 +1,169 @@
+import sqlite3
+from array import array
+from functools import lru_cache
+from glob import glob
+from hashlib import sha256
+from os import environ, makedirs
+from os.path import dirname, join
+
+from dimacs_generator import Node, NodeType
+
+
+# definition of the result cache object which keeps the verdicts of earlier runs on the same model in a database - the
+# verdicts are monotone in the bound, so every output only needs its largest safe bound and its smallest failing bound
+class ResultCache:
+    # the database path is relative to the source directory from which the checker is started - the environment
+    # variable replaces it, e.g. by :memory: to run without a persistent cache
+    PATH = environ.get('BMC_CACHE', '../cache/results.sqlite')
+
+    def __init__(self, aiger, path=PATH):
+        # the checker sources are part of the key, so a changed checker does not reuse the verdicts of an old one - the
+        # key holds no mode or bound since every verdict is stored together with the bound it holds for
+        key = sha256(ResultCache.get_source_digest())
+        key.update(aiger)
+        self.key = key.hexdigest()
+        if path != ':memory:':
+            makedirs(dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (model TEXT, output INTEGER, safe_bound INTEGER, fail_bound INTEGER, '
+                                'proved INTEGER, invariant BLOB, PRIMARY KEY (model, output))')
+        # the results of every output are kept in memory and written back when the cache is closed
+        self.results = {output: [safe_bound, fail_bound, proved, invariant] for output, safe_bound, fail_bound, proved, invariant in
+                        self.connection.execute('SELECT output, safe_bound, fail_bound, proved, invariant FROM results WHERE model = ?', (self.key,))}
+        self.changed = set()
+        self.removed = set()
+
+    # return the digest of the checker sources which is only computed once, since the engines open a cache for every
+    # refinement
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_source_digest():
+        digest = sha256()
+        for filename in sorted(glob(join(dirname(__file__) or '.', '*.py'))):
+            with open(filename, 'rb') as file:
+                digest.update(file.read())
+        return digest.digest()
+
+    # return the cached results of an output which are the largest safe bound, the smallest failing bound, a flag that
+    # is set if the output is safe for every bound and an invariant that proves it
+    def get_result(self, output):
+        return self.results.setdefault(output, [-1, None, 0, None])
+
+    # return true if the output is safe for the bound, false if it fails within the bound and none if it is unknown - a
+    # bad state found within a larger bound does not decide a smaller one
+    def get_verdict(self, bound, output=0):
+        safe_bound, fail_bound, proved, _ = self.get_result(output)
+        if proved or bound <= safe_bound:
+            return True
+        elif fail_bound is not None and fail_bound <= bound:
+            return False
+        return None
+
+    # return the step at which the output first reaches a bad state or none if it is unknown
+    def get_failure_step(self, output=0):
+        safe_bound, fail_bound, _, _ = self.get_result(output)
+        return fail_bound if fail_bound is not None and fail_bound == safe_bound + 1 else None
+
+    # add the verdict of a check of the output for the bound
+    def add_verdict(self, bound, safe, output=0):
+        result = self.get_result(output)
+        if safe:
+            result[0] = max(result[0], bound)
+        elif result[1] is None or bound < result[1]:
+            result[1] = bound
+        self.changed.add(output)
+
+    # add the proof that the output is safe for every bound together with the invariant of the model variables if there
+    # is one - the invariant is stored in conjunction with the constant latches and the merged variables that the model
+    # is preprocessed with, so it is also inductive on the parsed model without the preprocessing
+    def add_proof(self, model, invariant=None, output=0, constants=None, equivalences=None):
+        result = self.get_result(output)
+        result[2] = 1
+        result[3] = None if invariant is None else ResultCache.encode(invariant, model.original_variables, constants, equivalences).tobytes()
+        self.changed.add(output)
+
+    # remove the proof of the output if its invariant does not prove it anymore
+    def remove_proof(self, output=0):
+        result = self.get_result(output)
+        result[2] = 0
+        result[3] = None
+        self.changed.add(output)
+        self.removed.add(output)
+
+    # return true if the output is proved safe for every bound
+    def is_proved(self, output=0):
+        return bool(self.get_result(output)[2])
+
+    # return the cached invariant of the output over the variables of the model or none if there is none
+    def get_invariant(self, model, output=0):
+        invariant = self.get_result(output)[3]
+        if invariant is None:
+            return None
+        values = array('i')
+        values.frombytes(invariant)
+        return ResultCache.decode(values, {variable: i for i, variable in enumerate(model.original_variables)})
+
+    # return the formula as triples of node type and arguments where the arguments of a connective are the indices of
+    # earlier triples and a literal keeps its label in the variables of the parsed model - the constant latches and the
+    # variables merged with the aiger literal of their representative are added as conjuncts
+    @staticmethod
+    def encode(formula, original_variables, constants=None, equivalences=None):
+        values = array('i')
+        indices = {}
+        for subformula in formula.get_subformulas():
+            indices[subformula] = len(indices)
+            if subformula.is_connective():
+                values.extend((subformula.node_type.value, indices[subformula.first_argument], indices[subformula.second_argument]))
+            elif subformula.is_literal():
+                variable = original_variables[abs(subformula.label)]
+                values.extend((subformula.node_type.value, -variable if subformula.label < 0 else variable, 0))
+            else:
+                values.extend((subformula.node_type.value, 0, 0))
+        facts = [(variable, constant) for variable, constant in (constants or {}).items()] + list((equivalences or {}).items())
+        for variable, literal in facts:
+            root = len(values) // 3 - 1
+            if literal >> 1 == 0:
+                # the variable is equal to a constant, so it is asserted by its literal
+                values.extend((NodeType.LITERAL.value, variable if literal & 1 else -variable, 0))
+            else:
+                values.extend((NodeType.LITERAL.value, variable, 0, NodeType.LITERAL.value, -(literal >> 1) if literal & 1 else literal >> 1, 0,
+                               NodeType.EQUAL.value, root + 1, root + 2))
+            values.extend((NodeType.AND.value, root, len(values) // 3 - 1))
+        return values
+
+    # return the formula of the encoded triples or none if a literal is not a variable of the model
+    @staticmethod
+    def decode(values, variables):
+        formulas = []
+        for i in range(0, len(values), 3):
+            node_type, first_value, second_value = NodeType(values[i]), values[i + 1], values[i + 2]
+            if node_type is NodeType.LITERAL:
+                if abs(first_value) not in variables:
+                    return None
+                formulas.append(Node.literal(-variables[-first_value] if first_value < 0 else variables[first_value]))
+            elif node_type is NodeType.TRUE:
+                formulas.append(Node.TRUE)
+            elif node_type is NodeType.FALSE:
+                formulas.append(Node.FALSE)
+            elif node_type is NodeType.AND:
+                formulas.append(Node.and_formula(formulas[first_value], formulas[second_value]))
+            elif node_type is NodeType.OR:
+                formulas.append(Node.or_formula(formulas[first_value], formulas[second_value]))
+            elif node_type is NodeType.EQUAL:
+                formulas.append(Node.equal(formulas[first_value], formulas[second_value]))
+            else:
+                formulas.append(Node.not_equal(formulas[first_value], formulas[second_value]))
+        return formulas[-1]
+
+    # write the changed results back to the database - they are merged with the results that other runs have written meanwhile
+    def close(self):
+        with self.connection:
+            for output in self.removed:
+                self.connection.execute('UPDATE results SET proved = 0, invariant = NULL WHERE model = ? AND output = ?', (self.key, output))
+            for output in self.changed:
+                self.connection.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (model, output) DO UPDATE SET '
+                                        'safe_bound = max(safe_bound, excluded.safe_bound), '
+                                        'fail_bound = min(coalesce(fail_bound, excluded.fail_bound), coalesce(excluded.fail_bound, fail_bound)), '
+                                        'proved = max(proved, excluded.proved), invariant = coalesce(excluded.invariant, invariant)',
+                                        (self.key, output, *self.results[output]))
+        self.connection.close()
@@ -0,0 +1,272 @@
+from array import array
+from ctypes import CDLL, CFUNCTYPE, POINTER, c_int, c_void_p
+from math import inf
+from os.path import exists, join
+from shutil import rmtree
+from subprocess import run, PIPE, TimeoutExpired
+from tempfile import mkdtemp
+from threading import Timer
+
+from budget import Budget, BudgetExhausted
+from dimacs_generator import Generator
+from proof import Proof
+
+
+# definition of the sat solver object which streams dimacs formulas to the solver processes
+class SatSolver:
+    # the solver paths are relative to the source directory from which the checker is started
+    CORE = '../minisat/core/minisat_core'
+    PROOF = '../minisat_proof/minisat_proof'
+
+    def __init__(self, budget=None):
+        # every solve is limited by the budget of the check
+        self.budget = Budget() if budget is None else budget
+
+    # return the in-process solver if its library has been built and the solver processes otherwise
+    @staticmethod
+    def create(budget=None):
+        if exists(LibrarySolver.LIBRARY):
+            return LibrarySolver(budget)
+        else:
+            return SatSolver(budget)
+
+    # return true if the clauses are satisfiable
+    def solve(self, clauses):
+        return self.run_process([SatSolver.CORE, '-verb=0'], clauses)
+
+    # return the satisfiability of the clauses together with the resolution proof if they are unsatisfiable
+    def solve_with_proof(self, clauses):
+        # the solver refuses to overwrite an existing proof trace so it is written to a fresh directory
+        directory = mkdtemp()
+        try:
+            trace = join(directory, 'proof')
+            if self.run_process([SatSolver.PROOF, '-p', trace], clauses):
+                return True, None
+            with open(trace, 'rb') as file:
+                return False, Proof.read(file.read())
+        finally:
+            rmtree(directory)
+
+    # return the satisfiability of the clauses together with the values of the variables 1 to size if they are satisfiable
+    def solve_with_model(self, clauses, size):
+        # the core solver writes its model to a result file next to the dimacs formula read from its input
+        directory = mkdtemp()
+        try:
+            result = join(directory, 'model')
+            if not self.run_process([SatSolver.CORE, '-verb=0', '/dev/stdin', result], clauses):
+                return False, None
+            values = array('i', [0]) * size
+            with open(result) as file:
+                for literal in map(int, file.read().split()[1:]):
+                    if 0 < literal <= size:
+                        values[literal - 1] = 1
+            return True, values
+        finally:
+            rmtree(directory)
+
+    # return a session which keeps its clauses between checks - the solver processes start from scratch for every check
+    def open_session(self, proof=True):
+        return None
+
+    # return the result of a solver process on the dimacs formula of the clauses - the process is killed at the deadline
+    # of the budget and a process that exceeds the memory limit fails
+    def run_process(self, arguments, clauses):
+        try:
+            process = run(arguments, input=Generator.get_dimacs(clauses), stdout=PIPE, **self.budget.get_process_limits())
+        except TimeoutExpired:
+            raise BudgetExhausted('time')
+        # the solvers report an exhausted memory as indeterminate result and a process can also be killed while it allocates
+        if (process.returncode == 0 or process.returncode < 0) and self.budget.memory != inf:
+            raise BudgetExhausted('memory')
+        return self.get_result(process.returncode)
+
+    # both solvers report the result through their exit code
+    @staticmethod
+    def get_result(returncode):
+        if returncode == 10:
+            return True
+        elif returncode == 20:
+            return False
+        else:
+            raise RuntimeError(f'sat solver failed with exit code {returncode}')
+
+
+# definition of the library solver object which runs the proof logging solver in-process - the large satisfiability
+# checks without proof are still done by the faster core solver process
+class LibrarySolver(SatSolver):
+    LIBRARY = '../minisat_proof/libminisat_proof.so'
+    # the number of literals up to which starting the core solver process takes longer than solving in-process
+    SMALL = 10000
+
+    def __init__(self, budget=None):
+        SatSolver.__init__(self, budget)
+        self.library = CDLL(LibrarySolver.LIBRARY)
+        self.library.solver_new.argtypes = [c_int, SolverSession.ROOT_CALLBACK, SolverSession.CHAIN_CALLBACK]
+        self.library.solver_new.restype = c_void_p
+        self.library.solver_add_clauses.argtypes = [c_void_p, POINTER(c_int), c_int]
+        self.library.solver_add_clauses.restype = c_int
+        self.library.solver_solve.argtypes = [c_void_p, POINTER(c_int), c_int]
+        self.library.solver_solve.restype = c_int
+        self.library.solver_conflict_id.argtypes = [c_void_p]
+        self.library.solver_conflict_id.restype = c_int
+        self.library.solver_conflict.argtypes = [c_void_p, POINTER(c_int), c_int]
+        self.library.solver_conflict.restype = c_int
+        self.library.solver_model.argtypes = [c_void_p, POINTER(c_int), c_int]
+        self.library.solver_model.restype = None
+        self.library.solver_delete.argtypes = [c_void_p]
+        self.library.solver_delete.restype = None
+        self.library.solver_interrupt.argtypes = [c_void_p]
+        self.library.solver_interrupt.restype = None
+
+    # return true if the clauses are satisfiable
+    def solve(self, clauses):
+        literals = clauses if isinstance(clauses, array) else Generator.flatten(clauses)
+        if len(literals) <= LibrarySolver.SMALL:
+            return self.run(literals, False)[0]
+        return SatSolver.solve(self, literals)
+
+    # return the satisfiability of the clauses together with the resolution proof if they are unsatisfiable
+    def solve_with_proof(self, clauses):
+        satisfiable, proof = self.run(clauses, True)
+        return satisfiable, None if satisfiable else proof
+
+    # return the satisfiability of the clauses together with the values of the variables 1 to size if they are satisfiable
+    def solve_with_model(self, clauses, size):
+        session = SolverSession(self.library, False, self.budget)
+        try:
+            session.add_clauses(clauses)
+            if not session.solve([]):
+                return False, None
+            return True, session.get_model(size)
+        finally:
+            session.close()
+
+    # return a session of the proof logging solver which keeps its clauses, learnt clauses and proof between checks
+    def open_session(self, proof=True):
+        return SolverSession(self.library, proof, self.budget)
+
+    # pass the clauses as one integer buffer to a new solver and collect the proof from its callbacks
+    def run(self, clauses, proof):
+        session = SolverSession(self.library, proof, self.budget)
+        try:
+            session.add_clauses(clauses)
+            satisfiable = session.solve([])
+        finally:
+            session.close()
+        return satisfiable, session.proof
+
+
+# definition of the solver session object which keeps one in-process solver for incremental checks
+class SolverSession:
+    ROOT_CALLBACK = CFUNCTYPE(None, POINTER(c_int), c_int)
+    CHAIN_CALLBACK = CFUNCTYPE(None, POINTER(c_int), POINTER(c_int), c_int)
+
+    def __init__(self, library, proof, budget):
+        self.library = library
+        self.budget = budget
+        self.proof = Proof() if proof else None
+        # the callbacks cannot raise through the library, so an exhausted memory is kept until the call returns
+        self.failed = False
+        # the callbacks are kept alive as long as the solver calls them
+        self.root_callback = SolverSession.ROOT_CALLBACK(self.root)
+        self.chain_callback = SolverSession.CHAIN_CALLBACK(self.chain)
+        self.handle = self.library.solver_new(int(proof), self.root_callback, self.chain_callback)
+        # the library reports an exhausted memory instead of aborting the checker
+        if self.handle is None:
+            raise BudgetExhausted('memory')
+
+    # a root clause is passed with its literals
+    def root(self, literals, size):
+        try:
+            self.proof.add_root(literals[:size] if size else [])
+        except MemoryError:
+            self.failed = True
+
+    # a derived clause is passed as chain of clause ids and the variables resolved on between them
+    def chain(self, clause_ids, variables, size):
+        try:
+            self.proof.add_chain(clause_ids[:size + 1], variables[:size])
+        except MemoryError:
+            self.failed = True
+
+    # pass the clauses as one integer buffer to the solver
+    def add_clauses(self, clauses):
+        literals = clauses if isinstance(clauses, array) else Generator.flatten(clauses)
+        if self.library.solver_add_clauses(self.handle, (c_int * len(literals)).from_buffer(literals), len(literals)) < 0 or self.failed:
+            raise BudgetExhausted('memory')
+
+    # return true if the clauses are satisfiable under the assumed literals - otherwise the goal of the proof is the
+    # clause that refutes the assumptions
+    def solve(self, assumptions):
+        literals = array('i', assumptions)
+        # the solver is interrupted by a timer thread at the deadline, which runs while the library call releases the interpreter lock
+        timeout = self.budget.get_timeout()
+        timer = None if timeout is None else Timer(timeout, self.library.solver_interrupt, [self.handle])
+        if timer is not None:
+            timer.start()
+        try:
+            result = self.library.solver_solve(self.handle, (c_int * len(literals)).from_buffer(literals), len(literals))
+        finally:
+            if timer is not None:
+                timer.cancel()
+        if result == -2 or self.failed:
+            raise BudgetExhausted('memory')
+        elif result < 0:
+            raise BudgetExhausted('time')
+        satisfiable = bool(result)
+        if not satisfiable and self.proof is not None:
+            self.proof.goal = self.library.solver_conflict_id(self.handle)
+        return satisfiable
+
+    # return the values of the variables 1 to size after a satisfiable check where 1 is true and 0 is false
+    def get_model(self, size):
+        values = array('i', [0]) * size
+        self.library.solver_model(self.handle, (c_int * size).from_buffer(values), size)
+        return values
+
+    # return the assumed literals that refute the clauses after an unsatisfiable check
+    def get_conflict(self, size):
+        literals = array('i', [0]) * size
+        count = self.library.solver_conflict(self.handle, (c_int * size).from_buffer(literals), size)
+        return literals[:count]
+
+    # release the solver
+    def close(self):
+        self.library.solver_delete(self.handle)
+
+
+# definition of the process session object which passes all its clauses to a new core solver process for every check -
+# it serves the engines that need a session if the solver library has not been built
+class ProcessSession:
+    def __init__(self, solver):
+        self.solver = solver
+        self.literals = array('i')
+        self.variables = 0
+        self.assumptions = []
+        self.values = None
+
+    # keep the clauses for the following checks
+    def add_clauses(self, clauses):
+        literals = clauses if isinstance(clauses, array) else Generator.flatten(clauses)
+        self.literals.extend(literals)
+        self.variables = max(self.variables, max(map(abs, literals), default=0))
+
+    # return true if the clauses are satisfiable under the assumed literals which are passed as unit clauses
+    def solve(self, assumptions):
+        self.assumptions = list(assumptions)
+        self.variables = max(self.variables, max(map(abs, assumptions), default=0))
+        units = array('i', [value for literal in assumptions for value in (literal, 0)])
+        satisfiable, self.values = self.solver.solve_with_model(self.literals + units, self.variables)
+        return satisfiable
+
+    # return the values of the variables 1 to size after a satisfiable check where 1 is true and 0 is false
+    def get_model(self, size):
+        return self.values[:size] + array('i', [0]) * max(0, size - len(self.values))
+
+    # return the assumed literals that refute the clauses - the process reports no conflict, so these are all assumptions
+    def get_conflict(self, size):
+        return array('i', self.assumptions)
+
+    # nothing is kept between the checks
+    def close(self):
+        pass
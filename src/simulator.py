@@ -0,0 +1,120 @@
+from random import Random
+
+
+# definition of the simulator object which evaluates a model on many input patterns at once - every variable holds an
+# integer whose bits are its values in the different patterns
+class Simulator:
+    # the number of random patterns that are simulated at once
+    WIDTH = 1024
+    # the values of the ternary simulation have one bit that is set if the value can be one and one that is set if
+    # the value can be zero
+    ZERO = 0b01
+    ONE = 0b10
+    UNKNOWN = 0b11
+
+    def __init__(self, model):
+        self.model = model
+        self.random = Random(0)
+        self.mask = (1 << Simulator.WIDTH) - 1
+        self.order = self.get_and_gate_order()
+        # the random simulation starts in the initial state and is continued step by step
+        self.latch_values = [0] * model.number_of_latches
+        self.steps = 0
+        self.failure_step = None
+
+    # return the indices of the and gates where every and gate follows the and gates it depends on
+    def get_and_gate_order(self):
+        model = self.model
+        and_gates = {literal >> 1: i for i, literal in enumerate(model.and_gate_literals)}
+        visited = bytearray(model.number_of_and_gates)
+        order = []
+        for i in range(model.number_of_and_gates):
+            stack = [(i, False)]
+            while stack:
+                and_gate, expanded = stack.pop()
+                if expanded:
+                    order.append(and_gate)
+                elif not visited[and_gate]:
+                    visited[and_gate] = 1
+                    stack.append((and_gate, True))
+                    for literal in (model.and_gate_first_inputs[and_gate], model.and_gate_second_inputs[and_gate]):
+                        if literal >> 1 in and_gates and not visited[and_gates[literal >> 1]]:
+                            stack.append((and_gates[literal >> 1], False))
+        return order
+
+    # return the first step up to the bound at which a random pattern reaches a bad state or none if there is none
+    def find_failure(self, bound):
+        model = self.model
+        while self.failure_step is None and self.steps <= bound:
+            values = self.evaluate([self.random.getrandbits(Simulator.WIDTH) for _ in range(model.number_of_inputs)], self.latch_values, self.mask)
+            if self.get_value(values, model.output_literals[0], self.mask):
+                self.failure_step = self.steps
+            self.latch_values = [self.get_value(values, literal, self.mask) for literal in model.latch_next_literals]
+            self.steps += 1
+        return self.failure_step if self.failure_step is not None and self.failure_step <= bound else None
+
+    # return the values of every variable in a random simulation of the steps from the initial state - the values of
+    # the steps are concatenated, so variables with equal values in all patterns have equal signatures
+    def get_signatures(self, steps):
+        model = self.model
+        signatures = [0] * (model.maximum_variable_index + 1)
+        latch_values = [0] * model.number_of_latches
+        for step in range(steps):
+            values = self.evaluate([self.random.getrandbits(Simulator.WIDTH) for _ in range(model.number_of_inputs)], latch_values, self.mask)
+            for variable, value in enumerate(values):
+                signatures[variable] |= value << (Simulator.WIDTH * step)
+            latch_values = [self.get_value(values, literal, self.mask) for literal in model.latch_next_literals]
+        return signatures
+
+    # return the values of all variables in one step where all bits of the mask are simulated
+    def evaluate(self, input_values, latch_values, mask):
+        model = self.model
+        # the variable 0 is the constant false
+        values = [0] * (model.maximum_variable_index + 1)
+        for literal, value in zip(model.input_literals, input_values):
+            values[literal >> 1] = value
+        for literal, value in zip(model.latch_literals, latch_values):
+            values[literal >> 1] = value
+        for i in self.order:
+            values[model.and_gate_literals[i] >> 1] = (self.get_value(values, model.and_gate_first_inputs[i], mask) &
+                                                       self.get_value(values, model.and_gate_second_inputs[i], mask))
+        return values
+
+    # return the values of an aiger literal
+    @staticmethod
+    def get_value(values, literal, mask):
+        return values[literal >> 1] ^ mask if literal & 1 else values[literal >> 1]
+
+    # return the latches that keep their initial value in all reachable states as mapping from their variable to the
+    # constant aiger literal
+    def find_constant_latches(self):
+        model = self.model
+        # the latches start at zero and collect every value they take until nothing changes
+        latch_values = [Simulator.ZERO] * model.number_of_latches
+        while True:
+            values = self.evaluate_ternary(latch_values)
+            next_latch_values = [latch_value | self.get_ternary_value(values, literal) for latch_value, literal in zip(latch_values, model.latch_next_literals)]
+            if next_latch_values == latch_values:
+                return {literal >> 1: int(value == Simulator.ONE) for literal, value in zip(model.latch_literals, latch_values) if value != Simulator.UNKNOWN}
+            latch_values = next_latch_values
+
+    # return the ternary values of all variables in one step where the inputs are unknown
+    def evaluate_ternary(self, latch_values):
+        model = self.model
+        values = [Simulator.ZERO] * (model.maximum_variable_index + 1)
+        for literal in model.input_literals:
+            values[literal >> 1] = Simulator.UNKNOWN
+        for literal, value in zip(model.latch_literals, latch_values):
+            values[literal >> 1] = value
+        for i in self.order:
+            first_value = self.get_ternary_value(values, model.and_gate_first_inputs[i])
+            second_value = self.get_ternary_value(values, model.and_gate_second_inputs[i])
+            # the conjunction can only be one if both inputs can be one and is zero if one input can be zero
+            values[model.and_gate_literals[i] >> 1] = (first_value & second_value & Simulator.ONE) | ((first_value | second_value) & Simulator.ZERO)
+        return values
+
+    # return the ternary value of an aiger literal where negation swaps the two bits
+    @staticmethod
+    def get_ternary_value(values, literal):
+        value = values[literal >> 1]
+        return ((value & Simulator.ZERO) << 1) | (value >> 1) if literal & 1 else value
@@ -0,0 +1,130 @@
+from array import array
+
+from dimacs_generator import Generator
+from sat_solver import ProcessSession
+from simulator import Simulator
+
+
+# definition of the sweeper object which finds the and gates and latches of a model that are equivalent to an earlier
+# variable or its negation - the candidates have equal values in a random simulation and are confirmed by the sat solver
+class Sweeper:
+    # the number of simulated steps whose values form the signatures of the variables
+    STEPS = 16
+
+    def __init__(self, model, solver):
+        self.model = model
+        self.generator = Generator(model)
+        self.and_gates = {literal >> 1 for literal in model.and_gate_literals}
+        self.next_literals = {literal >> 1: next_literal for literal, next_literal in zip(model.latch_literals, model.latch_next_literals)}
+        # the merged variables mapped to the aiger literal of their representative
+        self.equivalences = {}
+        # one incremental solver keeps the gates of a single step - without the solver library every check is passed to a new solver process
+        self.session = solver.open_session(False) or ProcessSession(solver)
+        self.session.add_clauses(self.generator.generate_clauses(self.generator.step_equivalences()).literals)
+
+    # return the equivalences of the and gates in every state and of the latches in all reachable states
+    def sweep(self):
+        classes = self.get_candidate_classes()
+        # the and gate classes are split in place, so the latch classes start from the simulated ones
+        self.merge_and_gates(list(classes))
+        self.merge_latches(classes)
+        return self.equivalences
+
+    # return the classes of aiger literals with equal simulated values - every class starts with the constant, then the
+    # inputs, the latches and the and gates follow in topological order, so a literal never depends on an earlier one
+    def get_candidate_classes(self):
+        model = self.model
+        simulator = Simulator(model)
+        signatures = simulator.get_signatures(Sweeper.STEPS)
+        mask = (1 << (Simulator.WIDTH * Sweeper.STEPS)) - 1
+        classes = {}
+        variables = [0] + [literal >> 1 for literal in model.input_literals] + [literal >> 1 for literal in model.latch_literals]
+        variables.extend(model.and_gate_literals[i] >> 1 for i in simulator.order)
+        for variable in variables:
+            # the literal of a variable is negated if this makes the first simulated value zero
+            phase = signatures[variable] & 1
+            classes.setdefault(signatures[variable] ^ mask if phase else signatures[variable], []).append((variable << 1) | phase)
+        return [literals for literals in classes.values() if len(literals) > 1]
+
+    # merge every and gate of a class with its first literal if they are equivalent in every state - otherwise the
+    # counterexample splits the classes that are left
+    def merge_and_gates(self, classes):
+        while classes:
+            literals = classes.pop()
+            for i, literal in enumerate(literals[1:], 1):
+                if literal >> 1 not in self.and_gates:
+                    continue
+                if not self.is_equivalent(literal, literals[0]):
+                    classes = self.split(classes + [literals[:1] + literals[i:]], self.session.get_model(self.model.maximum_variable_index))
+                    break
+                self.equivalences[literal >> 1] = literals[0] ^ (literal & 1)
+                # the proven equivalence is kept for the later checks
+                self.session.add_clauses(self.get_equivalence_clauses(literal, literals[0]))
+
+    # merge the latches of every class with its first literal if all classes are kept by the transitions - the classes
+    # are split by the next state values of every counterexample until they are inductive
+    def merge_latches(self, classes):
+        # all latches start at zero, so the latches and the constant in one class are equal in the initial state
+        classes = [literals for literals in ([literal for literal in literals if literal >> 1 == 0 or literal >> 1 in self.next_literals]
+                                             for literals in classes) if len(literals) > 1]
+        refuted = True
+        while refuted:
+            refuted = False
+            # the equivalences of the current classes are assumed in the current state by an activation literal
+            self.model.label_running_index += 1
+            activation = self.model.label_running_index
+            self.session.add_clauses(array('i', [value for literals in classes for literal in literals[1:]
+                                                 for value in self.get_equivalence_clauses(literal, literals[0], activation)]))
+            for literals in classes:
+                for literal in literals[1:]:
+                    if not self.is_equivalent(self.get_next_literal(literal), self.get_next_literal(literals[0]), [activation]):
+                        classes = self.split(classes, self.session.get_model(self.model.maximum_variable_index), True)
+                        refuted = True
+                        break
+                if refuted:
+                    break
+            # the assumed equivalences are switched off for the later checks
+            self.session.add_clauses(array('i', [-activation, 0]))
+        for literals in classes:
+            for literal in literals[1:]:
+                self.equivalences[literal >> 1] = literals[0] ^ (literal & 1)
+
+    # return the classes split by the values of their literals or of the next states of their latches in the counterexample
+    def split(self, classes, values, next_state=False):
+        split_classes = []
+        for literals in classes:
+            parts = {}
+            for literal in literals:
+                parts.setdefault(self.get_value(values, self.get_next_literal(literal) if next_state else literal), []).append(literal)
+            split_classes.extend(part for part in parts.values() if len(part) > 1)
+        return split_classes
+
+    # return the value of an aiger literal in the counterexample
+    @staticmethod
+    def get_value(values, literal):
+        return values[(literal >> 1) - 1] ^ (literal & 1) if literal >> 1 else literal & 1
+
+    # return the aiger literal of the next state of a latch literal or of the constant
+    def get_next_literal(self, literal):
+        return self.next_literals[literal >> 1] ^ (literal & 1) if literal >> 1 else literal
+
+    # return true if the two aiger literals have the same value in every state that satisfies the assumptions
+    def is_equivalent(self, first_literal, second_literal, assumptions=()):
+        first_label = self.get_label(first_literal)
+        second_label = self.get_label(second_literal)
+        return not self.session.solve([*assumptions, first_label, -second_label]) and not self.session.solve([*assumptions, -first_label, second_label])
+
+    # return the flat clauses that the two aiger literals are equal if the optional activation literal is set
+    def get_equivalence_clauses(self, first_literal, second_literal, activation=None):
+        first_label = self.get_label(first_literal)
+        second_label = self.get_label(second_literal)
+        prefix = [] if activation is None else [-activation]
+        return array('i', prefix + [-first_label, second_label, 0] + prefix + [first_label, -second_label, 0])
+
+    # return the dimacs label of an aiger literal
+    def get_label(self, literal):
+        return self.generator.get_label(self.model.literal_object(literal))
+
+    # release the incremental solver
+    def close(self):
+        self.session.close()
@@ -1,6 +1,29 @@
+import json
 import unittest
+from array import array
+from contextlib import contextmanager, redirect_stdout
+from csv import DictReader
+from glob import glob
+from io import StringIO
+from itertools import product
 from math import inf
+from os import environ
+from os.path import exists, join
+from random import Random
 from subprocess import run, PIPE
+from tempfile import TemporaryDirectory
+
+from aiger_parser import Parser
+from bmc import BoundedModelChecker
+from budget import Budget
+from dimacs_generator import Generator, Node
+from interpolant_simplifier import InterpolantSimplifier
+from model_reducer import ModelReducer
+from result_cache import ResultCache
+from sat_solver import SatSolver
+from simulator import Simulator
+from sweeper import Sweeper
+from unrolling import Unrolling
 
 PART1_MODELS = [('texas.ifetch1^5.E', 19),
                 ('vis.eisenberg.E', 19),
@@ -16,6 +39,37 @@ PART2_MODELS = [('nusmv.syncarb5^2.B', inf),
                 ('nusmv.syncarb10^2.B', inf),
                 ('texas.ifetch1^8.E', 3)]
 
+INDUCTION_MODELS = [('vis.emodel.E', inf),
+                    ('ken.flash^13.C', inf),
+                    ('eijk.S386.S', inf),
+                    ('texas.ifetch1^8.E', 3)]
+
+
+# return the value of the formula for the values of its variables
+def evaluate(formula, values):
+    if formula.is_literal():
+        return values[abs(formula.label)] == (formula.label > 0)
+    elif formula.is_constant():
+        return formula.is_true()
+    first_value = evaluate(formula.first_argument, values)
+    second_value = evaluate(formula.second_argument, values)
+    if formula.is_and():
+        return first_value and second_value
+    elif formula.is_or():
+        return first_value or second_value
+    elif formula.is_equal():
+        return first_value == second_value
+    else:
+        return first_value != second_value
+
+
+# return a random formula of the depth over the literals of the variables 1 to size
+def get_random_formula(random, depth, size):
+    if depth == 0:
+        return Node.literal(random.choice([-1, 1]) * random.randint(1, size))
+    connective = random.choice([Node.and_formula, Node.or_formula, Node.equal, Node.not_equal])
+    return connective(get_random_formula(random, depth - 1, size), get_random_formula(random, depth - 1, size))
+
 
 def get_output(boolean):
     if boolean:
@@ -24,6 +78,102 @@ def get_output(boolean):
         return 'FAIL'
 
 
+# the latches follow the same input, so they are equal in all reachable states - the second and gate copies the
+# first one, the third one is constant false and the output gate is the negation of the bad state a and not b
+EQUIVALENCES_MODEL = '''aag 10 1 2 1 5
+2
+4 2
+6 2
+21
+12 4 7
+14 4 6
+16 6 4
+18 14 17
+20 19 13
+'''
+
+# the latch is set after the first step, so the output a and i reaches a bad state at step 1 for half of the inputs
+SHALLOW_FAILURE_MODEL = '''aag 3 1 1 1 1
+2
+4 1
+6
+6 4 2
+'''
+
+# the latches a, b and e are constant zero since e follows the conjunction of a and the input - the latches c, d and f
+# follow the constant true, the input and c
+CONSTANT_LATCHES_MODEL = '''aag 8 1 6 1 1
+2
+4 0
+6 6
+8 1
+10 2
+12 16
+14 8
+16
+16 4 2
+'''
+
+# the latches follow the same input, so the reachable states of the bad state a and not b converge after the first image
+CONVERGING_MODEL = '''aag 6 1 2 1 1
+2
+4 2
+6 2
+12
+12 4 7
+'''
+
+
+# the columns that a parsed model is made of
+MODEL_COLUMNS = ['maximum_variable_index', 'number_of_inputs', 'number_of_latches', 'number_of_outputs', 'number_of_and_gates', 'input_literals',
+                 'latch_literals', 'latch_next_literals', 'output_literals', 'and_gate_literals', 'and_gate_first_inputs', 'and_gate_second_inputs']
+
+
+# return the checker of a hand-built model given by its ascii text or of an example model given by its name - the
+# checker reads the model into memory, so the temporary file of a hand-built model is removed right away
+def get_checker(model, bound, mode, cache=False, **keywords):
+    if not model.startswith('aag '):
+        return BoundedModelChecker(f'../models/{model}.aag', bound, mode, cache=cache, **keywords)
+    with TemporaryDirectory() as directory:
+        filename = join(directory, 'model.aag')
+        with open(filename, 'w') as file:
+            file.write(model)
+        return BoundedModelChecker(filename, bound, mode, cache=cache, **keywords)
+
+
+# return the parsed model of a hand-built model given by its ascii text
+def get_model(model):
+    return Parser(model.encode(), 0).parse()
+
+
+# keep the verdicts of the checkers in a temporary database while the context is active
+@contextmanager
+def temporary_cache():
+    path = ResultCache.PATH
+    with TemporaryDirectory() as directory:
+        ResultCache.PATH = join(directory, 'results.sqlite')
+        try:
+            yield
+        finally:
+            ResultCache.PATH = path
+
+
+# the solver stub fails every check that uses the sat solver
+class UnusedSolver:
+    def __getattr__(self, name):
+        raise AssertionError(f'the sat solver is used by {name}')
+
+
+# the checks of the scripts keep their results in memory, so every test runs the engines instead of reading the
+# verdicts that an earlier test or run has stored
+def setUpModule():
+    environ['BMC_CACHE'] = ':memory:'
+
+
+def tearDownModule():
+    del environ['BMC_CACHE']
+
+
 class BmcTestCase(unittest.TestCase):
     def test_part1(self):
         for model_name, safe_bound in PART1_MODELS:
@@ -36,6 +186,15 @@ class BmcTestCase(unittest.TestCase):
                 expected_output = get_output(bound <= safe_bound)
                 self.assertEqual(script_output, expected_output)
 
+    def test_binary(self):
+        for model_name, safe_bound in PART1_MODELS:
+            print(f'testing binary for {model_name} ...')
+            bounds = {1} if safe_bound == inf else {safe_bound, safe_bound + 1}
+            for bound in bounds:
+                script_output = run(f'./run-part1.sh ../models/{model_name}.aig {bound}', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').strip()
+                expected_output = get_output(bound <= safe_bound)
+                self.assertEqual(script_output, expected_output)
+
     def test_part2(self):
         for model_name, safe_bound in PART2_MODELS:
             print(f'testing part2 for {model_name} ...')
@@ -43,6 +202,270 @@ class BmcTestCase(unittest.TestCase):
             expected_output = get_output(safe_bound == inf)
             self.assertEqual(script_output, expected_output)
 
+    def test_abstraction(self):
+        for model_name, safe_bound in PART2_MODELS:
+            print(f'testing abstraction for {model_name} ...')
+            script_output = run(f'./run-abstraction.sh ../models/{model_name}.aag', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').strip()
+            expected_output = get_output(safe_bound == inf)
+            self.assertEqual(script_output, expected_output)
+
+    def test_induction(self):
+        for model_name, safe_bound in INDUCTION_MODELS:
+            print(f'testing induction for {model_name} ...')
+            script_output = run(f'./run-induction.sh ../models/{model_name}.aag', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').strip()
+            expected_output = get_output(safe_bound == inf)
+            self.assertEqual(script_output, expected_output)
+
+    def test_pdr(self):
+        for model_name, safe_bound in PART2_MODELS:
+            print(f'testing pdr for {model_name} ...')
+            script_output = run(f'./run-pdr.sh ../models/{model_name}.aag', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').strip()
+            expected_output = get_output(safe_bound == inf)
+            self.assertEqual(script_output, expected_output)
+
+    def test_properties(self):
+        for model_name, safe_bound in PART1_MODELS:
+            print(f'testing properties for {model_name} ...')
+            bound = 8 if safe_bound == inf else safe_bound + 1
+            with TemporaryDirectory() as directory:
+                # the model gets a copy of its output and a constant false output
+                with open(f'../models/{model_name}.aag') as file:
+                    lines = file.read().splitlines()
+                header = lines[0].split()
+                outputs_start = 1 + int(header[2]) + int(header[3])
+                header[4] = '3'
+                lines = [' '.join(header)] + lines[1:outputs_start + 1] + [lines[outputs_start], '0'] + lines[outputs_start + 1:]
+                filename = join(directory, 'model.aag')
+                with open(filename, 'w') as file:
+                    file.write('\n'.join(lines) + '\n')
+                script_output = run(f'./run-properties.sh {filename} {bound}', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').split()
+            expected_output = [f'{output},OK,{bound}' if safe_bound == inf or output == 2 else f'{output},FAIL,{bound}' for output in range(3)]
+            self.assertEqual(script_output, expected_output)
+
+    def test_depth(self):
+        for model_name, safe_bound in PART1_MODELS:
+            print(f'testing depth for {model_name} ...')
+            script_output = run(f'./run-depth.sh ../models/{model_name}.aag 32', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8').split()
+            if safe_bound == inf:
+                self.assertEqual(script_output, ['OK,32'])
+            else:
+                # the witness lists the inputs of every step up to the first bad state
+                self.assertEqual(script_output[0], f'FAIL,{safe_bound + 1}')
+                self.assertEqual(len(script_output), safe_bound + 7)
+                self.assertEqual(script_output[-1], '.')
+
+    def test_profile(self):
+        print('testing profile for texas.ifetch1^5.E ...')
+        with TemporaryDirectory() as directory:
+            filename = join(directory, 'profile.jsonl')
+            script_output = run(f'pypy3 bmc.py ../models/texas.ifetch1^5.E.aag 19 0 0 {filename}', shell=True, stdout=PIPE).stdout.decode('utf-8').strip()
+            with open(filename) as file:
+                records = [json.loads(line) for line in file]
+        self.assertEqual(script_output, 'OK')
+        # the solver phase at the bound reports the size of the unrolled formula
+        solve_records = [record for record in records if record['phase'] == 'solve' and record['bound'] == 19]
+        self.assertEqual(len(solve_records), 1)
+        self.assertGreater(solve_records[0]['clauses'], 0)
+        # every phase is charged with the growth of the peak memory during its calls which is at most the peak of the process
+        for record in records:
+            self.assertGreaterEqual(record['peak_rss_growth_kb'], 0)
+            self.assertLessEqual(record['peak_rss_growth_kb'], record['process_peak_rss_kb'])
+
+    def test_batch(self):
+        print('testing batch for all part1 models ...')
+        bounds = sorted({bound for _, safe_bound in PART1_MODELS if safe_bound != inf for bound in (safe_bound, safe_bound + 1)})
+        models = ' '.join(f'../models/{model_name}.aag' for model_name, _ in PART1_MODELS)
+        script_output = run(f'./run-batch.sh 0 {",".join(map(str, bounds))} csv {models}', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8')
+        results = {(record['model'], int(record['bound'])): record['result'] for record in DictReader(script_output.splitlines())}
+        for model_name, safe_bound in PART1_MODELS:
+            for bound in bounds:
+                self.assertEqual(results[(f'../models/{model_name}.aag', bound)], get_output(bound <= safe_bound))
+
+    def test_batch_depth(self):
+        print('testing batch depth for all part1 models ...')
+        models = ' '.join(f'../models/{model_name}.aag' for model_name, _ in PART1_MODELS)
+        script_output = run(f'./run-batch.sh 4 32 csv {models}', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8')
+        results = {record['model']: (record['result'], int(record['step'])) for record in DictReader(script_output.splitlines())}
+        for model_name, safe_bound in PART1_MODELS:
+            # the step is the first bad state of a failing model and the bound of a safe one
+            self.assertEqual(results[f'../models/{model_name}.aag'], ('OK', 32) if safe_bound == inf else ('FAIL', safe_bound + 1))
+
+    def test_budget(self):
+        print('testing budget for eijk.bs6669.S and vis.emodel.E ...')
+        models = '../models/eijk.bs6669.S.aag ../models/vis.emodel.E.aag'
+        script_output = run(f'./run-budget.sh 1 0 csv 4 4096 {models}', cwd='../scripts', shell=True, stdout=PIPE).stdout.decode('utf-8')
+        records = {record['model']: record for record in DictReader(script_output.splitlines())}
+        # the model that is not proved within the budget reports the largest bound it is known to be safe for
+        self.assertEqual(records['../models/eijk.bs6669.S.aag']['result'], 'UNKNOWN')
+        self.assertGreaterEqual(int(records['../models/eijk.bs6669.S.aag']['step']), 1)
+        self.assertLess(float(records['../models/eijk.bs6669.S.aag']['seconds']), 8)
+        self.assertEqual(records['../models/vis.emodel.E.aag']['result'], 'OK')
+        # a check whose budget is used up before the first bound reports no bound
+        checker = get_checker('vis.emodel.E', 0, BoundedModelChecker.INTERPOLATION, budget=Budget(0))
+        output = StringIO()
+        with redirect_stdout(output):
+            self.assertIsNone(checker.start())
+        self.assertTrue(checker.exhausted)
+        self.assertIsNone(checker.safe_bound)
+        self.assertEqual(output.getvalue().strip(), 'UNKNOWN')
+
+    def test_cache(self):
+        print('testing cache for vis.emodel.E ...')
+        with open('../models/vis.emodel.E.aag') as file:
+            model = file.read()
+        with temporary_cache():
+            checker = get_checker(model, 0, BoundedModelChecker.INTERPOLATION, cache=True)
+            self.assertTrue(checker.start(False))
+            self.assertIsNotNone(checker.simulator)
+            # the repeated check is answered by the cache without preprocessing the model
+            checker = get_checker(model, 0, BoundedModelChecker.INTERPOLATION, cache=True)
+            self.assertTrue(checker.start(False))
+            self.assertIsNone(checker.simulator)
+            # other model bytes have another key, so the check runs again
+            checker = get_checker(model + 'changed\n', 0, BoundedModelChecker.INTERPOLATION, cache=True)
+            self.assertTrue(checker.start(False))
+            self.assertIsNotNone(checker.simulator)
+            # a bad state within a bound only decides the larger bounds
+            for bound, safe, cached in [(20, False, False), (19, True, False), (25, False, True), (10, True, True)]:
+                checker = get_checker('texas.ifetch1^5.E', bound, BoundedModelChecker.BOUNDED_MODEL_CHECKING, cache=True)
+                self.assertEqual(checker.start(False), safe)
+                self.assertEqual(checker.simulator is None, cached)
+
+    def test_cached_invariant(self):
+        print('testing cached invariant for eijk.S386.S ...')
+        with temporary_cache():
+            self.assertTrue(get_checker('eijk.S386.S', 0, BoundedModelChecker.PDR, cache=True).start(False))
+            # the invariant of the preprocessed model is checked on the model without the preprocessing and kept
+            checker = get_checker('eijk.S386.S', 0, BoundedModelChecker.PDR, cache=True)
+            self.assertTrue(checker.start(False))
+            self.assertIsNone(checker.simulator)
+            self.assertIsNotNone(checker.unrolling)
+            cache = ResultCache(checker.aiger, ResultCache.PATH)
+            try:
+                self.assertTrue(cache.is_proved())
+                self.assertIsNotNone(cache.get_invariant(checker.unrolling.model))
+            finally:
+                cache.close()
+
+    def test_parser(self):
+        print('testing parser for all models with an ascii and a binary file ...')
+        filenames = [filename for filename in sorted(glob('../models/*.aag')) if exists(filename[:-4] + '.aig')]
+        self.assertGreater(len(filenames), 0)
+        for filename in filenames:
+            ascii_model = Parser(Parser.read(filename), 0).parse()
+            binary_model = Parser(Parser.read(filename[:-4] + '.aig'), 0).parse()
+            for column in MODEL_COLUMNS:
+                self.assertEqual(getattr(ascii_model, column), getattr(binary_model, column), f'{filename} {column}')
+
+    def test_unrolling(self):
+        for model_name, _ in PART1_MODELS:
+            print(f'testing unrolling for {model_name} ...')
+            aiger = Parser.read(f'../models/{model_name}.aag')
+            # the unrolling that is extended and reserved again between the bounds emits the clauses of a fresh one
+            unrolling = Unrolling(aiger)
+            for bound in range(1, 11):
+                clauses = unrolling.bounded_model_checking_clauses(bound)
+                fresh_unrolling = Unrolling(aiger)
+                fresh_unrolling.reserve(unrolling.capacity)
+                self.assertEqual(clauses, fresh_unrolling.bounded_model_checking_clauses(bound))
+            # the clauses of a step are moved from the step 0 template as if the formula of the step was transformed
+            generator = unrolling.generator
+            model = unrolling.model
+            for unroller, formula in ((unrolling.equivalences, generator.step_equivalences()), (unrolling.transitions, generator.transition_formula())):
+                for step in range(4):
+                    first_label = model.label_running_index
+                    clauses = unroller.unroll(step)
+                    model.label_running_index = first_label
+                    self.assertEqual(clauses, generator.generate_clauses(generator.increment_steps(formula, step), {}, False).literals)
+
+    def test_encoding(self):
+        print('testing encoding for random formulas ...')
+        generator = Generator(get_model(EQUIVALENCES_MODEL))
+        solver = SatSolver.create()
+        random = Random(0)
+        size = 4
+        for _ in range(32):
+            formula = get_random_formula(random, 4, size)
+            clauses = generator.generate_clauses(formula, {}).literals
+            # the clauses of the formula are satisfiable together with the values of its variables if the formula is true for them
+            for values in product([False, True], repeat=size):
+                units = [value for variable, value in enumerate(values, 1) for value in (variable if value else -variable, 0)]
+                self.assertEqual(solver.solve(clauses + array('i', units)), evaluate(formula, dict(enumerate(values, 1))))
+
+    def test_simulation(self):
+        print('testing simulation for hand-built models ...')
+        checker = get_checker(SHALLOW_FAILURE_MODEL, 4, BoundedModelChecker.BOUNDED_MODEL_CHECKING)
+        checker.prepare()
+        # the random simulation finds the bad state, so the sat solver is never called
+        checker.solver = UnusedSolver()
+        self.assertFalse(checker.start_bmc(4))
+        self.assertEqual(checker.simulator.failure_step, 1)
+        checker.cache.close()
+        self.assertEqual(Simulator(get_model(CONSTANT_LATCHES_MODEL)).find_constant_latches(), {2: 0, 3: 0, 6: 0})
+
+    def test_fixpoint(self):
+        print('testing fixpoint for a model whose reachable states converge early ...')
+        # the sweep would merge the latches and leave nothing to interpolate
+        checker = get_checker(CONVERGING_MODEL, 0, BoundedModelChecker.INTERPOLATION, debug=True, sweep=False)
+        try:
+            checker.prepare()
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertTrue(checker.start_interpolation())
+            # the first interpolant adds the image of the initial states and the second one is contained in them
+            rows = [line.split(',') for line in output.getvalue().split()]
+            self.assertEqual([row[0] for row in rows], ['1', '1'])
+            invariant = checker.cache.get_invariant(checker.unrolling.model)
+            self.assertIsNotNone(invariant)
+            self.assertTrue(checker.is_invariant(invariant))
+        finally:
+            checker.cache.close()
+
+    def test_simplifier(self):
+        print('testing simplifier for cmu.gigamax.B ...')
+        simplify = InterpolantSimplifier.simplify
+        pairs = []
+
+        # the simplifications of the interpolation run are recorded together with their formulas
+        def record(simplifier, formula):
+            simplified_formula = simplify(simplifier, formula)
+            pairs.append((formula, simplified_formula))
+            return simplified_formula
+
+        InterpolantSimplifier.simplify = record
+        checker = get_checker('cmu.gigamax.B', 0, BoundedModelChecker.INTERPOLATION)
+        try:
+            checker.prepare()
+            self.assertTrue(checker.start_interpolation())
+        finally:
+            InterpolantSimplifier.simplify = simplify
+            checker.cache.close()
+        self.assertGreater(len(pairs), 0)
+        generator = checker.unrolling.generator
+        for formula, simplified_formula in pairs:
+            # the formulas differ in no assignment and the simplified one is never larger
+            self.assertFalse(checker.solver.solve(generator.generate_clauses(Node.not_equal(formula, simplified_formula), {})))
+            self.assertLessEqual(simplified_formula.count_nodes_in_formula(), formula.count_nodes_in_formula())
+        self.assertLess(sum(simplified_formula.count_nodes_in_formula() for _, simplified_formula in pairs),
+                        sum(formula.count_nodes_in_formula() for formula, _ in pairs))
+
+    def test_sweep(self):
+        print('testing sweep for a model with known equivalences ...')
+        model = ModelReducer(get_model(EQUIVALENCES_MODEL)).reduce(0)
+        sweeper = Sweeper(model, SatSolver.create())
+        try:
+            equivalences = sweeper.sweep()
+        finally:
+            sweeper.close()
+        and_gates = {literal >> 1 for literal in model.and_gate_literals}
+        self.assertEqual(len([variable for variable in equivalences if variable in and_gates]), 3)
+        self.assertEqual(len([variable for variable in equivalences if variable not in and_gates]), 1)
+        # the merged unrolling keeps the verdicts of the unswept one
+        for model, mode, bound in [(EQUIVALENCES_MODEL, BoundedModelChecker.INTERPOLATION, 0), (EQUIVALENCES_MODEL, BoundedModelChecker.BOUNDED_MODEL_CHECKING, 8),
+                                   ('texas.two_proc^1.E', BoundedModelChecker.BOUNDED_MODEL_CHECKING, 14), ('vis.emodel.E', BoundedModelChecker.INDUCTION, 0)]:
+            verdicts = [get_checker(model, bound, mode, sweep=sweep).start(False) for sweep in (False, True)]
+            self.assertEqual(verdicts[0], verdicts[1])
+            self.assertIsNotNone(verdicts[0])
 
 if __name__ == '__main__':
     unittest.main()
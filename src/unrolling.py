@@ -0,0 +1,137 @@
+from array import array
+
+from aiger_parser import Parser
+from dimacs_generator import Generator, Node, Unroller
+from model_reducer import ModelReducer
+
+
+# definition of the unrolling object which keeps the model and the clauses of every unrolled step between checks
+class Unrolling:
+    def __init__(self, aiger, constants=None, outputs=None, free_latches=None, merged=None):
+        self.aiger = aiger
+        # the checked outputs which are numbered in this order in the reduced model
+        self.outputs = outputs
+        # the latches that keep their initial value in all reachable states
+        self.constants = constants
+        # the latches that are abstracted to inputs
+        self.free_latches = free_latches
+        # the and gates and latches that are merged with an equivalent variable
+        self.merged = merged
+        self.capacity = -1
+        self.model = None
+        self.generator = None
+        self.equivalences = None
+        self.transitions = None
+        self.initial_clauses = None
+        self.equivalence_steps = []
+        self.transition_steps = []
+        self.simple_path_steps = []
+
+    # extend the unrolling to the passed bound - the steps that are already unrolled are kept
+    def extend(self, bound):
+        if bound > self.capacity:
+            self.reserve(max(bound, 2 * self.capacity))
+        while len(self.equivalence_steps) <= bound:
+            step = len(self.equivalence_steps)
+            self.equivalence_steps.append(self.equivalences.unroll(step))
+            if step > 0:
+                self.transition_steps.append(self.transitions.unroll(step - 1))
+
+    # parse the model with labels for the passed number of steps - the capacity is doubled if exceeded, so all reservations cost as much as the last one
+    def reserve(self, capacity):
+        self.capacity = capacity
+        # only the logic in the cone of influence of the checked outputs is unrolled
+        self.model = ModelReducer(Parser(self.aiger, capacity).parse(), self.outputs, self.constants, self.free_latches,
+                                  self.merged).reduce(capacity)
+        self.generator = Generator(self.model)
+        self.equivalences = Unroller(self.generator, self.generator.step_equivalences())
+        self.transitions = Unroller(self.generator, self.generator.transition_formula())
+        # the latches are initialized to zero and the sat solver is forced to pick the two constants to true and false
+        self.initial_clauses = Generator.flatten([(self.generator.get_label(out.get_negated_literal_copy()),) for out in self.model.latches] +
+                                                 [(self.model.true_index,), (-self.model.false_index,)])
+        self.equivalence_steps = []
+        self.transition_steps = []
+        self.simple_path_steps = []
+
+    # return the flat clauses of the bmc formula for the passed bound
+    def bounded_model_checking_clauses(self, bound):
+        self.extend(bound)
+        literals = array('i')
+        for step in range(bound + 1):
+            literals.extend(self.equivalence_steps[step])
+        for step in range(bound):
+            literals.extend(self.transition_steps[step])
+        literals.extend(self.initial_clauses)
+        literals.extend(self.safety_clause(0, bound))
+        return literals
+
+    # return the flat clauses that the step adds to the unrolling
+    def step_clauses(self, step):
+        self.extend(step)
+        literals = array('i', self.equivalence_steps[step])
+        if step == 0:
+            literals.extend(self.initial_clauses)
+        else:
+            literals.extend(self.transition_steps[step - 1])
+        return literals
+
+    # return the clause that is satisfied if the output reaches a bad state at any step from start to end
+    def safety_clause(self, start, end, output=0):
+        bad_state_detector = self.model.outputs[output]
+        return array('i', [self.generator.get_label(self.generator.increment_steps(bad_state_detector, i)) for i in range(start, end + 1)] + [0])
+
+    # return the flat clauses of the induction step which reaches a bad state at the step after the bound from safe states
+    # that are all different from each other
+    def induction_clauses(self, bound):
+        self.extend(bound + 1)
+        while len(self.simple_path_steps) <= bound + 1:
+            self.simple_path_steps.append(self.simple_path_clauses(len(self.simple_path_steps)))
+        literals = array('i', [self.model.true_index, 0, -self.model.false_index, 0])
+        for step in range(bound + 2):
+            literals.extend(self.equivalence_steps[step])
+            literals.extend(self.simple_path_steps[step])
+        for step in range(bound + 1):
+            literals.extend(self.transition_steps[step])
+            literals.extend(array('i', [-self.safety_clause(step, step)[0], 0]))
+        literals.extend(self.safety_clause(bound + 1, bound + 1))
+        return literals
+
+    # return the flat clauses that enforce that the latches at the step differ from the latches at every earlier step
+    def simple_path_clauses(self, step):
+        literals = array('i')
+        for earlier_step in range(step):
+            formula = Node.or_formula(Node.false(self.model), *[Node.not_equal(self.generator.increment_steps(out, earlier_step), self.generator.increment_steps(out, step))
+                                                                for out in self.model.latches])
+            literals.extend(self.generator.generate_clauses(formula, constants=False).literals)
+        return literals
+
+    # return the clause set of the first interpolation formula that reaches step 1 without the initial formula
+    def first_clauses(self):
+        self.extend(1)
+        clauses = {(self.model.true_index,), (-self.model.false_index,)}
+        clauses.update(self.clause_set(self.equivalence_steps[0]), self.clause_set(self.equivalence_steps[1]), self.clause_set(self.transition_steps[0]))
+        return clauses
+
+    # return the clause set of the second interpolation formula that reaches a bad state at the bound from step 1
+    def second_clauses(self, bound):
+        self.extend(bound)
+        clauses = {(self.model.true_index,), (-self.model.false_index,)}
+        for step in range(2, bound + 1):
+            clauses.update(self.clause_set(self.equivalence_steps[step]))
+        for step in range(1, bound):
+            clauses.update(self.clause_set(self.transition_steps[step]))
+        clauses.update(self.clause_set(self.safety_clause(bound, bound)))
+        return clauses
+
+    # return the flat zero terminated clauses as set of sorted clauses
+    @staticmethod
+    def clause_set(literals):
+        clauses = set()
+        clause = []
+        for literal in literals:
+            if literal == 0:
+                clauses.add(Generator.get_clause(*clause))
+                clause = []
+            else:
+                clause.append(literal)
+        return clauses